@@ -0,0 +1,61 @@
+"""
+Benchmark of the delta-neutral allocator on a large fleet.
+
+    python -m benchmarks.bench_delta_neutral
+"""
+import time
+
+import numpy as np
+
+from src.utils.delta_neutral import create_delta_neutral_strategy
+
+ACCOUNTS = 10_000
+RUNS = 5
+SMALL_BALANCES = [0.4, 0.3, 0.2, 5, 3, 2, 1, 0.6, 0.7, 0.1]
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    balances = {f'account_{index}': float(balance) for index, balance in enumerate(rng.uniform(5, 500, ACCOUNTS))}
+
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        positions = create_delta_neutral_strategy(balances, ['SOL', 'ETH', 'BTC'], seed=42)
+        timings.append(time.perf_counter() - started)
+
+    assert positions == create_delta_neutral_strategy(balances, ['SOL', 'ETH', 'BTC'], seed=42), 'not reproducible'
+
+    # Positions come as a long followed by the shorts of its group
+    groups = []
+    for position in positions:
+        if position['direction'] == 'long':
+            groups.append({'long': round(position['total_size'] * 100), 'shorts': []})
+        else:
+            groups[-1]['shorts'].append(round(position['total_size'] * 100))
+
+    unbalanced = sum(group['long'] != sum(group['shorts']) for group in groups)
+    duplicated = sum(len(set(group['shorts'])) != len(group['shorts']) for group in groups)
+    max_leverage = max(position['leverage'] for position in positions)
+    over_balance = sum(position['base_size'] > balances[position['account']] + 0.01 for position in positions)
+    non_positive = sum(position['total_size'] <= 0 or position['base_size'] <= 0 for position in positions)
+
+    print(f'{ACCOUNTS} accounts -> {len(groups)} groups, {len(positions)} legs')
+    print(f'best {min(timings) * 1000:.1f} ms, median {sorted(timings)[RUNS // 2] * 1000:.1f} ms')
+    print(f'groups with non-zero delta: {unbalanced}, with duplicate short sizes: {duplicated}')
+    print(f'max leverage {max_leverage}, legs above balance {over_balance}, non-positive legs {non_positive}')
+
+    # Small balances used to produce zero or negative legs
+    small = dict(zip([f'account_{index}' for index in range(10)], SMALL_BALANCES))
+    bad_legs = 0
+    for seed in range(300):
+        for position in create_delta_neutral_strategy(small, ['SOL'], seed=seed):
+            bad_legs += (
+                position['total_size'] <= 0 or position['base_size'] <= 0
+                or position['base_size'] > small[position['account']] + 0.01
+            )
+    print(f'small balances, 300 seeds: bad legs {bad_legs}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of database generation: bulk single-transaction insert vs the per-row add_to_db path.
+
+    python -m benchmarks.bench_generate_database
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+# The engine binds transactions.db to the working directory at import time,
+# so move to a scratch directory first to keep the real database untouched
+sys.path.insert(0, os.getcwd())
+os.chdir(tempfile.mkdtemp())
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig  # noqa: E402
+from src.database.models import engine, init_models  # noqa: E402
+from src.database.utils.db_manager import DataBaseUtils  # noqa: E402
+from src.database.generate_database import clear_database  # noqa: E402
+
+TASKS = ['OKX_WITHDRAW', 'BACKPACK_SPOT', 'BACKPACK_FUTURES', 'RANDOM_SWAPS',
+         'CLOSE_ALL', 'SWAP_ALL_TO_USDC', 'GET_TICKERS', 'OKX_DEPOSIT']
+BULK_WALLETS = 100_000 // len(TASKS)
+PER_ROW_WALLETS = 250
+
+
+def make_wallets(count: int) -> list[dict]:
+    return [
+        {'private_key': f'key_{index:08d}', 'proxy': f'user:pass@10.0.{index % 256}.1:8000',
+         'recipient': None, 'status': 'pending'}
+        for index in range(count)
+    ]
+
+
+async def per_row(wallets: list[dict]) -> None:
+    for wallet in wallets:
+        db_utils = DataBaseUtils(manager_config=DataBaseManagerConfig(action='working_wallets'))
+        await db_utils.add_to_db(
+            private_key=wallet['private_key'],
+            proxy=wallet['proxy'],
+            recipient=wallet['recipient'],
+            status='pending'
+        )
+        for task in TASKS:
+            db_utils = DataBaseUtils(manager_config=DataBaseManagerConfig(action='wallets_tasks'))
+            await db_utils.add_to_db(private_key=wallet['private_key'], status='pending', task_name=task)
+
+
+async def main() -> None:
+    logger.remove()
+    await init_models(engine)
+
+    wallets = make_wallets(PER_ROW_WALLETS)
+    started = time.perf_counter()
+    await per_row(wallets)
+    per_row_rate = PER_ROW_WALLETS * (len(TASKS) + 1) / (time.perf_counter() - started)
+
+    await clear_database(engine)
+    wallets = make_wallets(BULK_WALLETS)
+    started = time.perf_counter()
+    db_utils = DataBaseUtils(manager_config=DataBaseManagerConfig(action='working_wallets'))
+    await db_utils.bulk_add_wallets(wallets, TASKS)
+    elapsed = time.perf_counter() - started
+    rows = BULK_WALLETS * (len(TASKS) + 1)
+
+    pending = await db_utils.get_uncompleted_wallets()
+    assert len(pending) == BULK_WALLETS, 'not all wallets were inserted'
+
+    print(f'per-row: {per_row_rate:,.0f} rows/s, {rows} rows would take ~{rows / per_row_rate:.0f} s')
+    print(f'bulk:    {rows / elapsed:,.0f} rows/s, {rows} rows in {elapsed:.2f} s')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Benchmark of route loading at startup on a 10k-wallet database.
+
+    python -m benchmarks.bench_get_routes
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+# The engine binds transactions.db to the working directory at import time,
+# so move to a scratch directory first to keep the real database untouched
+sys.path.insert(0, os.getcwd())
+os.chdir(tempfile.mkdtemp())
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig  # noqa: E402
+from src.database.models import engine, init_models  # noqa: E402
+from src.database.utils.db_manager import DataBaseUtils  # noqa: E402
+from src.utils.data.wallet_registry import WalletRegistry  # noqa: E402
+from src.utils.retrieve_route import get_routes  # noqa: E402
+
+TASKS = ['OKX_WITHDRAW', 'BACKPACK_SPOT', 'BACKPACK_FUTURES', 'RANDOM_SWAPS',
+         'CLOSE_ALL', 'SWAP_ALL_TO_USDC', 'GET_TICKERS', 'OKX_DEPOSIT']
+WALLETS = 10_000
+RUNS = 5
+
+
+async def main() -> None:
+    logger.remove()
+    await init_models(engine)
+
+    private_keys = [f'key_{index:08d}' for index in range(WALLETS)]
+    proxies = [f'user:pass@10.0.{index % 256}.1:8000' for index in range(WALLETS)]
+    wallet_registry = WalletRegistry(private_keys, proxies, [None] * WALLETS)
+
+    db_utils = DataBaseUtils(manager_config=DataBaseManagerConfig(action='working_wallets'))
+    await db_utils.bulk_add_wallets(
+        [{'private_key': private_key, 'proxy': wallet_registry.raw_proxy_of(private_key),
+          'recipient': None, 'status': 'pending'} for private_key in private_keys],
+        TASKS
+    )
+
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        routes = await get_routes(wallet_registry)
+        timings.append(time.perf_counter() - started)
+
+    assert len(routes) == WALLETS and all(route.tasks == TASKS for route in routes), 'routes do not match'
+
+    print(f'{WALLETS} wallets x {len(TASKS)} tasks -> {len(routes)} routes')
+    print(f'best {min(timings) * 1000:.0f} ms, median {sorted(timings)[RUNS // 2] * 1000:.0f} ms')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Benchmark of per-wallet task lookups on a 100k-row wallets_tasks table, with and without indexes.
+
+    python -m benchmarks.bench_task_lookups
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+# The engine binds transactions.db to the working directory at import time,
+# so move to a scratch directory first to keep the real database untouched
+sys.path.insert(0, os.getcwd())
+os.chdir(tempfile.mkdtemp())
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig  # noqa: E402
+from src.database.models import engine, init_models, WalletsTasks  # noqa: E402
+from src.database.utils.db_manager import DataBaseUtils  # noqa: E402
+
+TASKS = ['OKX_WITHDRAW', 'BACKPACK_SPOT', 'BACKPACK_FUTURES', 'RANDOM_SWAPS',
+         'CLOSE_ALL', 'SWAP_ALL_TO_USDC', 'GET_TICKERS', 'OKX_DEPOSIT']
+WALLETS = 100_000 // len(TASKS)
+LOOKUPS = 1_000
+
+
+async def lookups(db_utils: DataBaseUtils, keys: list[str]) -> float:
+    started = time.perf_counter()
+    for private_key in keys:
+        await db_utils.get_wallet_pending_tasks(private_key)
+    return LOOKUPS / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    logger.remove()
+    await init_models(engine)
+
+    db_utils = DataBaseUtils(manager_config=DataBaseManagerConfig(action='wallets_tasks'))
+    wallets = [{'private_key': f'key_{index:08d}', 'proxy': None, 'recipient': None, 'status': 'pending'}
+               for index in range(WALLETS)]
+    await db_utils.bulk_add_wallets(wallets, TASKS)
+
+    keys = random.Random(0).sample([wallet['private_key'] for wallet in wallets], LOOKUPS)
+
+    async with engine.begin() as conn:
+        for index in WalletsTasks.__table__.indexes:
+            await conn.run_sync(index.drop)
+    without_indexes = await lookups(db_utils, keys)
+
+    async with engine.begin() as conn:
+        for index in WalletsTasks.__table__.indexes:
+            await conn.run_sync(index.create)
+    with_indexes = await lookups(db_utils, keys)
+
+    print(f'{WALLETS * len(TASKS)} task rows, {LOOKUPS} get_wallet_pending_tasks lookups')
+    print(f'without indexes: {without_indexes:,.0f} lookups/s')
+    print(f'with indexes:    {with_indexes:,.0f} lookups/s ({with_indexes / without_indexes:.0f}x)')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,20 +1,86 @@
 MOBILE_PROXY = False  # True - мобильные proxy/False - обычные proxy
 ROTATE_IP = False  # Настройка только для мобильных proxy
+ROTATE_IP_MAX_ATTEMPTS = 5  # Сколько раз пытаться сменить IP, после чего кошелек пропускается
+ROTATE_IP_BACKOFF = 4  # Начальная пауза между попытками смены IP, удваивается с каждой попыткой, сек
+ROTATE_IP_CONFIRM_TIMEOUT = 30  # Сколько секунд ждать, пока новый IP начнет отвечать
 
 TG_BOT_TOKEN = ''  # str ('2282282282:AAZYB35L2PoziKsri6RFPOASdkal-z1Wi_s')
 TG_USER_ID = None  # int (22822822) or None
 
 SHUFFLE_WALLETS = False
+SCHEDULE_LONGEST_FIRST = False  # Запускать первыми кошельки с самыми долгими (по истории) маршрутами
 PAUSE_BETWEEN_WALLETS = [10, 15]
 PAUSE_BETWEEN_MODULES = [15, 20]
+WARMUP_LOOKAHEAD = 2  # Сколько следующих кошельков заранее подготавливать во время пауз (ротация IP, сессия, баланс). 0 - выключено
 RETRIES = 3  # Сколько раз повторять 'зафейленное' действие
 PAUSE_BETWEEN_RETRIES = 15  # Пауза между повторами
 
+# Сколько кошельков одновременно могут находиться на каждом этапе
+# (withdraw - OKX_WITHDRAW, trading - торговые модули, deposit - OKX_DEPOSIT)
+STAGE_CONCURRENCY = {
+    'withdraw': 1,
+    'trading': 10,
+    'deposit': 3,
+}
+
+# --- Status writer --- #
+STATUS_WRITER_BATCH_SIZE = 50  # Сколько изменений статусов записывать в БД одной транзакцией
+STATUS_WRITER_FLUSH_INTERVAL = 1  # Максимальная задержка записи статуса в БД, сек
+
+# --- Proxy pool --- #
+PROXY_BAN_COOLDOWN = 300  # Сколько секунд не использовать прокси после ответа 403/429
+PROXY_MIN_SUCCESS_RATE = 0.5  # Доля успешных запросов, ниже которой кошелек переключается на запасной прокси
+PROXY_HEALTH_CHECK_INTERVAL = 60  # Как часто перепроверять неработающие прокси, сек
+PROXY_CHECK_BEFORE_RUN = True  # Проверять все прокси перед отработкой по БД (нерабочие помечаются, proxies.txt не меняется)
+PROXY_CHECK_TTL = 600  # Сколько секунд результат проверки прокси считается актуальным
+PROXY_CHECK_TIMEOUT = 5  # Таймаут проверки одного прокси, сек
+PROXY_CHECK_CONCURRENCY = 100  # Сколько прокси проверять одновременно
+
+# --- Archive --- #
+ARCHIVE_DB_PATH = 'archive.db'  # Файл, куда переносятся завершенные прогоны (кошельки, задачи, вилки) при создании новой БД
+ARCHIVE_TASK_DURATIONS_AFTER_DAYS = 30  # История длительностей задач старше стольких дней переносится в архив при сжатии БД
+
+# --- Preflight --- #
+PREFLIGHT_BEFORE_RUN = False  # Проверять API ключи и прокси всех кошельков перед отработкой по БД
+PREFLIGHT_EXCLUDE_FAILED = True  # Пропускать кошельки, не прошедшие проверку
+PREFLIGHT_TTL = 3600  # Сколько секунд результат проверки считается актуальным
+PREFLIGHT_CONCURRENCY = 20  # Сколько кошельков проверять одновременно
+PREFLIGHT_RATE = 10  # Максимум запросов в секунду во время проверки
+
+# --- Deposit addresses --- #
+DEPOSIT_ADDRESS_CONCURRENCY = 10  # Сколько адресов получать одновременно
+DEPOSIT_ADDRESS_RATE = 5  # Максимум запросов адресов в секунду
+
+# --- Balance snapshots --- #
+BALANCE_SNAPSHOT_TTL = 300  # Сколько секунд сохраненный баланс считается актуальным (вилки, проверка min_usdc_balance, отчеты)
+BALANCE_SNAPSHOT_CONCURRENCY = 20  # Сколько балансов запрашивать одновременно
+BALANCE_SNAPSHOT_RATE = 10  # Максимум запросов балансов в секунду
+
+# --- Forks --- #
+FORKS_SEED = None  # int - одинаковое распределение вилок при одинаковых балансах / None - случайное
+FORKS_CONCURRENCY = 3  # Сколько вилок открывать одновременно
+FORKS_START_SPACING = [10, 15]  # Пауза между запусками вилок
+FORK_DELTA_TOLERANCE = 0.01  # Допустимый дисбаланс лонг/шорт после открытия вилки (0.01 - 1% от размера стороны)
+FORK_REBALANCE_ATTEMPTS = 2  # Сколько раз пытаться добрать недостающую сторону, прежде чем закрыть излишек
+
+# Мониторинг открытых вилок
+FORK_MONITOR_INTERVAL = 60  # Как часто опрашивать позиции (один запрос на аккаунт)
+FORK_MONITOR_MAX_DELTA_USD = 20  # Оповещение, если дельта вилки в USD больше
+FORK_MONITOR_MAX_MARGIN_USAGE = 0.8  # Оповещение, если поддерживающая маржа занимает больше 80% выделенного баланса
+FORK_MONITOR_MIN_LIQUIDATION_DISTANCE = 0.1  # Оповещение, если до ликвидации меньше 10% от цены
+
+# --- Worker mode --- #
+WORKER_PROCESSES = 2  # Количество процессов, которые параллельно разбирают кошельки из базы
+WORKER_CONCURRENCY = 5  # Сколько кошельков одновременно обрабатывает один процесс
+WORKER_LEASE_SECONDS = 300  # Время аренды кошелька. Если процесс упал, кошелек вернется в работу по истечении аренды
+
 # -------------------------------------------------------------------------
 
 # --- CEXs --- #
 OKX_WITHDRAW = False  # Вывод с ОКХ на кошельки
 OKX_DEPOSIT = False  # Вывод с кошельков на ОКХ
+OKX_CURRENCIES_TTL = 3600  # Сколько секунд использовать сохраненный список валют и комиссий OKX без обновления
+OKX_CURRENCIES_CACHE_PATH = 'okx_currencies.json'  # Файл, где хранится список валют и комиссий OKX между запусками
 
 # ====== BackPack ====== #
 # ====== AUTOMATIC TRADING OPTIONS ======
@@ -1,7 +1,10 @@
-from asyncio import run, set_event_loop_policy, gather, create_task, sleep
+from asyncio import run, set_event_loop_policy, gather, create_task, sleep, to_thread, Task
+from collections import deque
+from functools import partial
+from multiprocessing import Process
 import random
 import asyncio
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, AsyncIterator
 import logging
 import sys
 
@@ -9,14 +12,28 @@ from questionary import select, Choice
 from loguru import logger
 
 from config import *
-from src.utils.data.helper import private_keys, proxies, recipients, filter_and_update_proxies
-from src.database.generate_database import generate_database
+from src.utils.data.helper import wallet_registry
+from src.database.generate_database import generate_database, sync_database
+from src.database.archive import compact_database
 from src.database.models import init_models, engine
-from src.utils.data.mappings import module_handlers
-from src.utils.manage_tasks import manage_tasks, manage_fork
-from src.utils.retrieve_route import get_routes, get_forks_tasks
-from src.models.route import Route
+from src.utils.data.mappings import module_handlers, module_stages
+from src.utils.manage_tasks import manage_tasks, manage_task_duration, manage_fork
+from src.utils.retrieve_route import iter_routes, get_forks_tasks, get_monitored_forks
+from src.models.route import Route, RouteRecord
 from src.utils.tg_app.telegram_notifications import TGApp
+from src.utils.pipeline import StagePipeline
+from src.utils.task_durations import order_routes_longest_first, print_durations_report
+from src.utils.worker import RouteLeases, run_worker, reset_released_leases
+from src.utils.warmup import WarmUp
+from src.utils.preflight import run_preflight, exclude_failed_routes
+from src.utils.balance_snapshots import print_balances_report, invalidate_balance
+from src.utils.fork_monitor import ForkMonitor
+from src.utils.fork_executions import print_fork_executions_report
+from src.modules.backpack.account_pool import account_pool
+from src.utils.proxy_checks import validate_proxies
+from src.utils.proxy_manager import ip_rotator
+from src.utils.proxy_pool import proxy_pool
+from src.utils.status_writer import status_writer
 from src.utils.runner import process_multiple_deposit_addresses, process_forks_database_creation, process_fork
 
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
@@ -35,6 +52,12 @@ def get_module():
             Choice(title="2) Work with existing database", value=2),
             Choice(title="3) Forks mode", value=3),
             Choice(title="4) Get deposit addresses", value=4),
+            Choice(title="5) Task durations report", value=5),
+            Choice(title="6) Worker mode", value=6),
+            Choice(title="7) Preflight check", value=7),
+            Choice(title="8) Balances report", value=8),
+            Choice(title="9) Sync database with files", value=9),
+            Choice(title="10) Compact database", value=10),
         ],
         qmark="⚙️ ",
         pointer="✅ "
@@ -42,90 +65,268 @@ def get_module():
     return result
 
 
-async def process_task(routes: list[Route]) -> None:
-    if not routes:
+async def process_task(routes: AsyncIterator[RouteRecord], leases: RouteLeases) -> None:
+    async def next_route() -> Route | None:
+        record = await anext(routes, None)
+        return record.to_route() if record else None
+
+    route = await next_route()
+    if not route:
+        await leases.release_all()
         logger.success(f'All tasks are completed')
         return
 
-    tasks = []
-    for route in routes:
-        tasks.append(create_task(process_route(route)))
+    pipeline = StagePipeline(
+        handlers=module_handlers,
+        task_stages=module_stages,
+        concurrency=STAGE_CONCURRENCY
+    )
+
+    warmup = WarmUp()
+
+    # Only running wallets and the warm-up lookahead are held in memory, the rest stays in the database
+    running: set[Task] = set()
+    upcoming: deque[Route] = deque()
+    try:
+        while route:
+            task = create_task(process_route(route, pipeline, warmup, leases))
+            running.add(task)
+            task.add_done_callback(running.discard)
 
-        time_to_pause = random.randint(PAUSE_BETWEEN_WALLETS[0], PAUSE_BETWEEN_WALLETS[1]) \
-            if isinstance(PAUSE_BETWEEN_WALLETS, list) else PAUSE_BETWEEN_WALLETS
-        logger.info(f'Sleeping {time_to_pause} seconds before next wallet...')
-        await sleep(time_to_pause)
+            while len(upcoming) < WARMUP_LOOKAHEAD:
+                next_one = await next_route()
+                if not next_one:
+                    break
+                upcoming.append(next_one)
+                warmup.prefetch(next_one)
 
-    await gather(*tasks)
+            route = upcoming.popleft() if upcoming else await next_route()
+            if not route:
+                break
 
+            time_to_pause = random.randint(PAUSE_BETWEEN_WALLETS[0], PAUSE_BETWEEN_WALLETS[1]) \
+                if isinstance(PAUSE_BETWEEN_WALLETS, list) else PAUSE_BETWEEN_WALLETS
+            # A rotation that will run when the wallet starts is counted into the pause
+            time_to_pause = max(0, round(time_to_pause - warmup.rotation_delay(route)))
+            logger.info(f'Sleeping {time_to_pause} seconds before next wallet...')
+            await sleep(time_to_pause)
 
-async def process_route(route: Route) -> None:
-    if route.wallet.proxy:
-        if route.wallet.proxy.proxy_url and MOBILE_PROXY and ROTATE_IP:
-            await route.wallet.proxy.change_ip()
+        await gather(*running)
+    finally:
+        # Routes read ahead but never started must not keep their leases
+        await leases.release_all()
+        await status_writer.stop()
+    await pipeline.stop()
+    pipeline.log_metrics()
+    await account_pool.close()
+    await proxy_pool.stop()
+    ip_rotator.log_metrics()
+    await ip_rotator.close()
 
+
+async def process_route(
+        route: Route,
+        pipeline: StagePipeline,
+        warmup: WarmUp | None = None,
+        leases: RouteLeases | None = None
+) -> None:
     private_key = route.wallet.private_key
 
-    for task in route.tasks:
-        completed = await module_handlers[task](route)
+    try:
+        if warmup:
+            await warmup.ready(route)
+        elif route.wallet.proxy:
+            if route.wallet.proxy.proxy_url and MOBILE_PROXY and ROTATE_IP:
+                await route.wallet.proxy.change_ip()
+    except RuntimeError as ex:
+        # The wallet keeps its pending tasks for the next run rather than working from a stale IP
+        logger.error(f'Skipping wallet {private_key[:4]}...{private_key[-4:]}: {ex}')
+        await account_pool.release(private_key)
+        if leases:
+            await leases.release(private_key)
+        return
+
+    try:
+        for task in route.tasks:
+            task_run = await pipeline.run(task, route)
+            completed = task_run.result
+            await manage_task_duration(private_key, task, task_run)
+            if task_run.error:
+                raise task_run.error
+
+            if completed:
+                await manage_tasks(private_key, task)
+
+            time_to_pause = random.randint(PAUSE_BETWEEN_MODULES[0], PAUSE_BETWEEN_MODULES[1]) \
+                if isinstance(PAUSE_BETWEEN_MODULES, list) else PAUSE_BETWEEN_MODULES
+
+            logger.info(f'Sleeping {time_to_pause} seconds before next module...')
+            await sleep(time_to_pause)
+
+        if TG_BOT_TOKEN and TG_USER_ID:
+            await status_writer.flush()
+            tg_app = TGApp(
+                token=TG_BOT_TOKEN,
+                tg_id=TG_USER_ID,
+                private_key=private_key
+            )
+            await tg_app.send_message()
+    finally:
+        if warmup:
+            warmup.release(route)
+        # Failed tasks may have moved funds too, the next run reads the balance live
+        await invalidate_balance(private_key)
+        await account_pool.release(private_key)
+        if leases:
+            await leases.release(private_key)
+
+
+async def process_forks(tasks: list) -> None:
+    semaphore = asyncio.Semaphore(FORKS_CONCURRENCY)
 
-        if completed:
-            await manage_tasks(private_key, task)
+    async def run_fork(task) -> None:
+        try:
+            completed = await process_fork(task)
+            if completed:
+                await manage_fork(task.id)
+        finally:
+            semaphore.release()
 
-        time_to_pause = random.randint(PAUSE_BETWEEN_MODULES[0], PAUSE_BETWEEN_MODULES[1]) \
-            if isinstance(PAUSE_BETWEEN_MODULES, list) else PAUSE_BETWEEN_MODULES
+    # Fork groups use disjoint accounts, so they can run side by side
+    running = []
+    try:
+        for task in tasks:
+            await semaphore.acquire()
+            running.append(create_task(run_fork(task)))
 
-        logger.info(f'Sleeping {time_to_pause} seconds before next module...')
-        await sleep(time_to_pause)
+            if task is not tasks[-1]:
+                time_to_sleep = random.randint(FORKS_START_SPACING[0], FORKS_START_SPACING[1]) \
+                    if isinstance(FORKS_START_SPACING, list) else FORKS_START_SPACING
+                logger.info(f'Sleeping {time_to_sleep} seconds before next fork...')
+                await sleep(time_to_sleep)
+
+        await gather(*running)
+    finally:
+        await status_writer.stop()
+    await account_pool.close()
+    await proxy_pool.stop()
+    ip_rotator.log_metrics()
+    await ip_rotator.close()
+
+
+async def worker_main() -> None:
+    await init_models(engine)
+    if PROXY_CHECK_BEFORE_RUN:
+        await validate_proxies(proxy_pool, PROXY_CHECK_TTL, PROXY_CHECK_TIMEOUT, PROXY_CHECK_CONCURRENCY)
+    pipeline = StagePipeline(
+        handlers=module_handlers,
+        task_stages=module_stages,
+        concurrency=STAGE_CONCURRENCY
+    )
 
-    if TG_BOT_TOKEN and TG_USER_ID:
-        tg_app = TGApp(
-            token=TG_BOT_TOKEN,
-            tg_id=TG_USER_ID,
-            private_key=private_key
-        )
-        await tg_app.send_message()
+    await run_worker(
+        wallet_registry=wallet_registry,
+        process_route=partial(process_route, pipeline=pipeline),
+        concurrency=WORKER_CONCURRENCY,
+        lease_seconds=WORKER_LEASE_SECONDS
+    )
+    await status_writer.stop()
+    await pipeline.stop()
+    pipeline.log_metrics()
+    await proxy_pool.stop()
+    ip_rotator.log_metrics()
+    await ip_rotator.close()
+
+
+def start_worker() -> None:
+    start_event_loop(worker_main())
 
 
 async def main(module: Callable) -> None:
     await init_models(engine)
     if module == 1:
+        private_keys = list(wallet_registry.private_keys)
         if SHUFFLE_WALLETS:
             random.shuffle(private_keys)
         logger.debug("Generating new database")
-        await generate_database(engine, private_keys, proxies, recipients)
+        await generate_database(engine, private_keys, wallet_registry)
     elif module == 2:
         logger.debug("Working with the database")
-        routes = await get_routes(private_keys)
-        await process_task(routes)
+        if PROXY_CHECK_BEFORE_RUN:
+            await validate_proxies(proxy_pool, PROXY_CHECK_TTL, PROXY_CHECK_TIMEOUT, PROXY_CHECK_CONCURRENCY)
+        if PREFLIGHT_BEFORE_RUN:
+            await run_preflight(wallet_registry, PREFLIGHT_CONCURRENCY, PREFLIGHT_RATE)
+        await reset_released_leases()
+        routes = iter_routes(wallet_registry)
+        if PREFLIGHT_EXCLUDE_FAILED:
+            routes = exclude_failed_routes(routes, PREFLIGHT_TTL)
+        if SCHEDULE_LONGEST_FIRST:
+            routes = order_routes_longest_first(routes)
+        # Leased last, so only the running wallets and the warm-up lookahead hold a lease
+        leases = RouteLeases(WORKER_LEASE_SECONDS)
+        await process_task(leases.claim(routes), leases)
     elif module == 3:
         result = await select(
             message="Choose module",
             choices=[
                 Choice(title="1) Generate new forks database", value=1),
                 Choice(title="2) Work with existing forks database", value=2),
+                Choice(title="3) Monitor forks exposure", value=3),
+                Choice(title="4) Fork execution report", value=4),
             ],
             qmark="⚙️ ",
             pointer="✅ "
         ).ask_async()
         if result == 1:
-            await process_forks_database_creation(private_keys, proxies)
+            await process_forks_database_creation(wallet_registry.private_keys)
         elif result == 2:
             tasks = await get_forks_tasks()
             if not tasks:
                 logger.success(f'All forks are completed. Create new database.')
                 return
-            for task in tasks:
-                completed = await process_fork(task, proxies)
-                if completed:
-                    await manage_fork(task.id)
-
-                time_to_sleep = random.randint(PAUSE_BETWEEN_WALLETS[0], PAUSE_BETWEEN_WALLETS[1])
-                logger.info(f'Sleeping {time_to_sleep} seconds before next fork...')
-                await sleep(time_to_sleep)
+            await process_forks(tasks)
+        elif result == 3:
+            forks, legs = await get_monitored_forks()
+            if not forks:
+                logger.success(f'There are no forks to monitor. Create new database.')
+                return
+            monitor = ForkMonitor(
+                forks=forks,
+                legs=legs,
+                wallet_registry=wallet_registry,
+                interval=FORK_MONITOR_INTERVAL,
+                max_delta_usd=FORK_MONITOR_MAX_DELTA_USD,
+                max_margin_usage=FORK_MONITOR_MAX_MARGIN_USAGE,
+                min_liquidation_distance=FORK_MONITOR_MIN_LIQUIDATION_DISTANCE
+            )
+            await monitor.run()
+        elif result == 4:
+            await print_fork_executions_report()
     elif module == 4:
         logger.debug("Getting deposit addresses for all wallets")
-        await process_multiple_deposit_addresses(private_keys, proxies)
+        await process_multiple_deposit_addresses(wallet_registry.private_keys)
+    elif module == 5:
+        await print_durations_report()
+    elif module == 6:
+        logger.debug(f"Starting {WORKER_PROCESSES} worker processes")
+        await reset_released_leases()
+        if PROXY_CHECK_BEFORE_RUN:
+            await validate_proxies(proxy_pool, PROXY_CHECK_TTL, PROXY_CHECK_TIMEOUT, PROXY_CHECK_CONCURRENCY)
+        workers = [Process(target=start_worker) for _ in range(WORKER_PROCESSES)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            await to_thread(worker.join)
+    elif module == 7:
+        await run_preflight(wallet_registry, PREFLIGHT_CONCURRENCY, PREFLIGHT_RATE)
+    elif module == 8:
+        await print_balances_report(wallet_registry, BALANCE_SNAPSHOT_TTL, BALANCE_SNAPSHOT_CONCURRENCY,
+                                    BALANCE_SNAPSHOT_RATE)
+    elif module == 9:
+        logger.debug("Syncing database with wallets, proxies, recipients and enabled modules")
+        await sync_database(wallet_registry.private_keys, wallet_registry)
+    elif module == 10:
+        await compact_database(engine, ARCHIVE_DB_PATH, ARCHIVE_TASK_DURATIONS_AFTER_DAYS, BALANCE_SNAPSHOT_TTL)
 
     else:
         print("Wrong choice")
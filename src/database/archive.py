@@ -0,0 +1,122 @@
+import os
+import time
+
+from loguru import logger
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+
+from src.database.models import (
+    WorkingWallets,
+    WalletsTasks,
+    TaskDurations,
+    Forks,
+    ForkLegs,
+    ForkExecutions,
+    Runs,
+)
+
+ARCHIVED_TABLES = {
+    'wallets': [WorkingWallets.__table__, WalletsTasks.__table__],
+    'forks': [Forks.__table__, ForkLegs.__table__, ForkExecutions.__table__],
+}
+
+
+def ensure_archive_table(conn, table: Table) -> None:
+    """Archive tables keep the columns of the live table, without keys, sequences or indexes."""
+    existing = {row[1] for row in conn.execute(text(f'PRAGMA archive.table_info({table.name})'))}
+    columns = [(column.name, column.type.compile(dialect=conn.dialect)) for column in table.columns]
+    if not existing:
+        definition = ', '.join(f'{name} {column_type}' for name, column_type in columns)
+        conn.execute(text(f'CREATE TABLE archive.{table.name} ({definition})'))
+        return
+
+    for name, column_type in columns:
+        if name not in existing:
+            conn.execute(text(f'ALTER TABLE archive.{table.name} ADD COLUMN {name} {column_type}'))
+
+
+async def move_rows(conn: AsyncConnection, table: Table, where: str = '1', params: dict | None = None) -> int:
+    await conn.run_sync(ensure_archive_table, table)
+    columns = ', '.join(column.name for column in table.columns)
+    await conn.execute(
+        text(f'INSERT INTO archive.{table.name} ({columns}) SELECT {columns} FROM main.{table.name} WHERE {where}'),
+        params or {}
+    )
+    result = await conn.execute(text(f'DELETE FROM main.{table.name} WHERE {where}'), params or {})
+    return result.rowcount
+
+
+async def attach_archive(conn: AsyncConnection, archive_path: str) -> None:
+    # ATTACH is not allowed inside a transaction, it has to be the first statement on the connection
+    await conn.execute(text('ATTACH DATABASE :path AS archive'), {'path': archive_path})
+
+
+async def archive_run(engine: AsyncEngine, kind: str, archive_path: str) -> None:
+    """
+    Moves every row of the current `kind` run (wallets or forks) and its run record into the archive
+    database in one transaction, so the live tables only ever hold the run being worked on.
+    """
+    tables = ARCHIVED_TABLES[kind]
+    async with engine.connect() as conn:
+        await attach_archive(conn, archive_path)
+        try:
+            moved = {table.name: await move_rows(conn, table) for table in tables}
+            await conn.execute(
+                text('UPDATE main.runs SET archived_at = :now WHERE kind = :kind AND archived_at IS NULL'),
+                {'now': time.time(), 'kind': kind}
+            )
+            await move_rows(conn, Runs.__table__, 'kind = :kind', {'kind': kind})
+            await conn.commit()
+        except Exception:
+            # DETACH fails while the transaction still holds the archive, which would hide the real error
+            await conn.rollback()
+            raise
+        finally:
+            await conn.execute(text('DETACH DATABASE archive'))
+
+    if any(moved.values()):
+        summary = ', '.join(f'{name} {count}' for name, count in moved.items())
+        logger.info(f'Archived {kind} run to {archive_path}: {summary}')
+
+
+async def compact_database(
+        engine: AsyncEngine,
+        archive_path: str,
+        durations_keep_days: int,
+        snapshots_max_age: int
+) -> None:
+    """
+    Keeps the hot tables small: old task durations go to the archive, expired balance snapshots are dropped,
+    then the database file is vacuumed and the WAL truncated.
+    """
+    database_path = engine.url.database
+    size_before = os.path.getsize(database_path) if os.path.exists(database_path) else 0
+
+    async with engine.connect() as conn:
+        await attach_archive(conn, archive_path)
+        try:
+            durations = await move_rows(
+                conn, TaskDurations.__table__, 'finished_at < :before',
+                {'before': time.time() - durations_keep_days * 86400}
+            )
+            snapshots = await conn.execute(
+                text('DELETE FROM main.balance_snapshots WHERE fetched_at < :before'),
+                {'before': time.time() - snapshots_max_age}
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            await conn.execute(text('DETACH DATABASE archive'))
+
+    async with engine.connect() as conn:
+        # VACUUM rewrites the whole file and cannot run inside a transaction
+        await conn.exec_driver_sql('VACUUM')
+        await conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    size_after = os.path.getsize(database_path) if os.path.exists(database_path) else 0
+    logger.success(
+        f'Database compacted: {durations} task durations archived, {snapshots.rowcount} balance snapshots dropped, '
+        f'{size_before / 1024 / 1024:.1f} MB -> {size_after / 1024 / 1024:.1f} MB'
+    )
@@ -3,7 +3,14 @@ from pydantic import BaseModel, validator, Field, root_validator
 from src.database.models import (
     WorkingWallets,
     WalletsTasks,
-    Forks
+    TaskDurations,
+    WalletChecks,
+    ProxyChecks,
+    DepositAddresses,
+    BalanceSnapshots,
+    Forks,
+    ForkLegs,
+    ForkExecutions
 )
 
 
@@ -14,7 +21,9 @@ class DataBaseManagerConfig(BaseModel):
 
     @validator('action', pre=True)
     def validate_action(cls, v):
-        if v not in ['working_wallets', 'wallets_tasks', 'forks_mode']:
+        if v not in ['working_wallets', 'wallets_tasks', 'task_durations', 'wallet_checks', 'proxy_checks', 'deposit_addresses',
+                     'balance_snapshots', 'forks_mode', 'fork_legs',
+                     'fork_executions']:
             raise ValueError(f'...')
         return v
 
@@ -23,7 +32,14 @@ class DataBaseManagerConfig(BaseModel):
         table_mapping = {
             'working_wallets': WorkingWallets,
             'wallets_tasks': WalletsTasks,
-            'forks_mode': Forks
+            'task_durations': TaskDurations,
+            'wallet_checks': WalletChecks,
+            'proxy_checks': ProxyChecks,
+            'deposit_addresses': DepositAddresses,
+            'balance_snapshots': BalanceSnapshots,
+            'forks_mode': Forks,
+            'fork_legs': ForkLegs,
+            'fork_executions': ForkExecutions
         }
         action = values.get('action')
 
@@ -4,8 +4,10 @@ from sqlalchemy import delete
 from loguru import logger
 
 from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.archive import archive_run, compact_database
 from src.database.models import WorkingWallets, WalletsTasks
 from src.database.utils.db_manager import DataBaseUtils
+from src.utils.data.wallet_registry import WalletRegistry
 from config import *
 
 
@@ -18,13 +20,7 @@ async def clear_database(engine) -> None:
     logger.info("The database has been cleared")
 
 
-async def generate_database(
-        engine,
-        private_keys: list[str],
-        proxies: list[str],
-        recipients: list[str]
-) -> None:
-    await clear_database(engine)
+def get_enabled_tasks() -> list[str]:
     tasks = []
     if OKX_WITHDRAW: tasks.append('OKX_WITHDRAW')
     if BACKPACK_SPOT: tasks.append('BACKPACK_SPOT')
@@ -34,52 +30,64 @@ async def generate_database(
     if SWAP_ALL_TO_USDC: tasks.append('SWAP_ALL_TO_USDC')
     if GET_TICKERS: tasks.append('GET_TICKERS')
     if OKX_DEPOSIT: tasks.append('OKX_DEPOSIT')
+    return tasks
+
+
+def get_wallet_rows(private_keys: list[str], wallet_registry: WalletRegistry) -> list[dict]:
+    return [
+        {
+            'private_key': private_key,
+            'proxy': wallet_registry.raw_proxy_of(private_key),
+            'recipient': wallet_registry.recipient_of(private_key) if OKX_DEPOSIT else None,
+            'status': 'pending'
+        }
+        for private_key in private_keys
+    ]
+
+
+async def generate_database(
+        engine,
+        private_keys: list[str],
+        wallet_registry: WalletRegistry
+) -> None:
+    # The previous run is kept in the archive database instead of being wiped
+    await archive_run(engine, 'wallets', ARCHIVE_DB_PATH)
+    await clear_database(engine)
+    tasks = get_enabled_tasks()
+
+    if OKX_DEPOSIT and not wallet_registry.has_all_recipients(private_keys):
+        logger.error(f'Количество приватных ключей не соответствует количеству адресов получателей')
+        return
 
-    proxy_index = 0
-    for private_key in private_keys:
-        with open('wallets.txt', 'r') as file:
-            file_private_keys = [line.strip() for line in file]
-
-        private_key_index = file_private_keys.index(private_key)
-        recipient_address = None
-        if OKX_DEPOSIT:
-            if len(private_keys) != len(recipients):
-                logger.error(f'Количество приватных ключей не соответствует количеству адресов получателей')
-                return
-            recipient_address = recipients[private_key_index]
-
-        proxy = proxies[proxy_index]
-        proxy_index = (proxy_index + 1) % len(proxies)
-
-        proxy_url = None
-        change_link = ''
-
-        if proxy:
-            if MOBILE_PROXY:
-                proxy_url, change_link = proxy.split('|')
-            else:
-                proxy_url = proxy
-
-        db_utils = DataBaseUtils(
-            manager_config=DataBaseManagerConfig(
-                action='working_wallets'
-            )
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='working_wallets'
         )
+    )
+    run_id = await db_utils.start_run('wallets')
+    await db_utils.bulk_add_wallets(get_wallet_rows(private_keys, wallet_registry), tasks, run_id)
+    await compact_database(engine, ARCHIVE_DB_PATH, ARCHIVE_TASK_DURATIONS_AFTER_DAYS, BALANCE_SNAPSHOT_TTL)
+
+
+async def sync_database(
+        private_keys: list[str],
+        wallet_registry: WalletRegistry
+) -> None:
+    tasks = get_enabled_tasks()
+
+    if OKX_DEPOSIT and not wallet_registry.has_all_recipients(private_keys):
+        logger.error(f'Количество приватных ключей не соответствует количеству адресов получателей')
+        return
 
-        await db_utils.add_to_db(
-            private_key=private_key,
-            proxy=f'{proxy_url}|{change_link}' if MOBILE_PROXY else proxy_url,
-            recipient=recipient_address,
-            status='pending',
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='working_wallets'
         )
-        for task in tasks:
-            db_utils = DataBaseUtils(
-                manager_config=DataBaseManagerConfig(
-                    action='wallets_tasks'
-                )
-            )
-            await db_utils.add_to_db(
-                private_key=private_key,
-                status='pending',
-                task_name=task
-            )
+    )
+    run_id = await db_utils.get_current_run('wallets') or await db_utils.start_run('wallets')
+    changes = await db_utils.sync_wallets_tables(get_wallet_rows(private_keys, wallet_registry), tasks, run_id)
+    logger.success(
+        f"Database synced: {changes['wallets_added']} wallets added, {changes['wallets_updated']} updated, "
+        f"{changes['wallets_retired']} retired; {changes['tasks_added']} tasks added, "
+        f"{changes['tasks_retired']} retired"
+    )
@@ -4,11 +4,16 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.dialects.sqlite import JSON
 from sqlalchemy import (
+    event,
+    Index,
     Sequence,
     Integer,
     Column,
     String,
     Float,
+    Boolean,
+    inspect,
+    text,
 )
 
 Base = declarative_base()
@@ -16,6 +21,10 @@ Base = declarative_base()
 
 class WorkingWallets(Base):
     __tablename__ = 'working_wallets'
+    __table_args__ = (
+        Index('ix_working_wallets_private_key_status', 'private_key', 'status'),
+        Index('ix_working_wallets_status', 'status'),
+    )
     id = Column(Integer, Sequence('working_wallets_id_seq'), primary_key=True)
     private_key = Column(String)
     proxy = Column(String, nullable=True)
@@ -23,14 +32,99 @@ class WorkingWallets(Base):
 
     status = Column(String)
 
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(Float, nullable=True)
+
+    run_id = Column(Integer, nullable=True)
+
 
 class WalletsTasks(Base):
     __tablename__ = 'wallets_tasks'
+    __table_args__ = (
+        Index('ix_wallets_tasks_private_key_status', 'private_key', 'status'),
+        Index('ix_wallets_tasks_private_key_task_name', 'private_key', 'task_name'),
+    )
 
     id = Column(Integer, Sequence('wallets_tasks_id_seq'), primary_key=True)
     private_key = Column(String, unique=False)
     task_name = Column(String, unique=False)
     status = Column(String, unique=False)
+    # Place of the task in the enabled modules list, routes run tasks in this order
+    position = Column(Integer, nullable=True)
+
+    run_id = Column(Integer, nullable=True)
+
+
+class TaskDurations(Base):
+    __tablename__ = 'task_durations'
+
+    id = Column(Integer, Sequence('task_durations_id_seq'), primary_key=True)
+    private_key = Column(String, unique=False)
+    task_name = Column(String, unique=False)
+    started_at = Column(Float, unique=False)
+    finished_at = Column(Float, unique=False)
+    requests = Column(Integer, unique=False)
+    status = Column(String, unique=False)
+
+
+class WalletChecks(Base):
+    __tablename__ = 'wallet_checks'
+
+    id = Column(Integer, Sequence('wallet_checks_id_seq'), primary_key=True)
+    private_key = Column(String, unique=True)
+    proxy = Column(String, nullable=True)
+    api_ok = Column(Boolean)
+    proxy_ok = Column(Boolean)
+    error = Column(String, nullable=True)
+    checked_at = Column(Float)
+
+
+class ProxyChecks(Base):
+    __tablename__ = 'proxy_checks'
+
+    id = Column(Integer, Sequence('proxy_checks_id_seq'), primary_key=True)
+    proxy = Column(String, unique=True)
+    ok = Column(Boolean)
+    status = Column(Integer, nullable=True)
+    latency = Column(Float, nullable=True)
+    checked_at = Column(Float)
+
+
+class DepositAddresses(Base):
+    __tablename__ = 'deposit_addresses'
+    __table_args__ = (
+        Index('ix_deposit_addresses_private_key_chain', 'private_key', 'chain'),
+    )
+
+    id = Column(Integer, Sequence('deposit_addresses_id_seq'), primary_key=True)
+    private_key = Column(String, unique=False)
+    chain = Column(String, unique=False)
+    address = Column(String, unique=False)
+    fetched_at = Column(Float, unique=False)
+
+
+class BalanceSnapshots(Base):
+    __tablename__ = 'balance_snapshots'
+    __table_args__ = (
+        Index('ix_balance_snapshots_private_key_symbol', 'private_key', 'symbol'),
+    )
+
+    id = Column(Integer, Sequence('balance_snapshots_id_seq'), primary_key=True)
+    private_key = Column(String, unique=False)
+    symbol = Column(String, unique=False)
+    available = Column(Float, unique=False)
+    fetched_at = Column(Float, unique=False)
+
+
+class Runs(Base):
+    __tablename__ = 'runs'
+    # Run ids are never reused, archived rows keep pointing at their own run
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = Column(Integer, Sequence('runs_id_seq'), primary_key=True)
+    kind = Column(String, unique=False)
+    started_at = Column(Float, unique=False)
+    archived_at = Column(Float, nullable=True)
 
 
 class Forks(Base):
@@ -42,15 +136,93 @@ class Forks(Base):
     forks = Column(JSON, unique=False)
     status = Column(String, unique=False)
 
+    run_id = Column(Integer, nullable=True)
+
+
+class ForkLegs(Base):
+    __tablename__ = 'fork_legs'
+
+    id = Column(Integer, Sequence('fork_legs_id_seq'), primary_key=True)
+    fork_id = Column(Integer, index=True)
+    private_key = Column(String, index=True)
+    symbol = Column(String, unique=False)
+    side = Column(String, unique=False)
+    base_size = Column(Float, unique=False)
+    total_size = Column(Float, unique=False)
+    leverage = Column(Float, unique=False)
+    quantity = Column(Float, nullable=True)
+    filled_quantity = Column(Float, default=0)
+    fill_price = Column(Float, nullable=True)
+    order_id = Column(String, nullable=True)
+    status = Column(String, unique=False)
+    updated_at = Column(Float, nullable=True)
+
+    run_id = Column(Integer, nullable=True)
+
+
+class ForkExecutions(Base):
+    __tablename__ = 'fork_executions'
+
+    id = Column(Integer, Sequence('fork_executions_id_seq'), primary_key=True)
+    fork_id = Column(Integer, unique=False)
+    execution_id = Column(String, unique=False)
+    private_key = Column(String, unique=False)
+    symbol = Column(String, unique=False)
+    side = Column(String, unique=False)
+    kind = Column(String, unique=False)
+    submit_at = Column(Float, unique=False)
+    ack_at = Column(Float, nullable=True)
+    fill_at = Column(Float, nullable=True)
+    requested_quantity = Column(Float, unique=False)
+    filled_quantity = Column(Float, unique=False)
+    expected_price = Column(Float, nullable=True)
+    fill_price = Column(Float, nullable=True)
+    slippage_bps = Column(Float, nullable=True)
+
 
 logging.getLogger('sqlalchemy.engine').setLevel(logging.ERROR)
 
+# How long a connection waits for a lock held by another connection or process, ms
+SQLITE_BUSY_TIMEOUT = 30_000
+
 engine = create_async_engine(
     'sqlite+aiosqlite:///transactions.db',
-    echo=False
+    echo=False,
+    connect_args={'timeout': SQLITE_BUSY_TIMEOUT / 1000}
 )
 
 
+@event.listens_for(engine.sync_engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers work alongside the single writer, NORMAL fsyncs only on checkpoints
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}')
+    cursor.close()
+
+
+def add_missing_columns(conn) -> None:
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+def add_missing_indexes(conn) -> None:
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+
+
 async def init_models(engine: AsyncEngine):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(add_missing_indexes)
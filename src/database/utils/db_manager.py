@@ -1,5 +1,7 @@
+import time
 import types
 import asyncio
+import uuid
 
 from typing import (
     Optional,
@@ -7,14 +9,27 @@ from typing import (
     Any,
 )
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, insert, delete, update, or_, and_, bindparam, Row
 from sqlalchemy.sql import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from loguru import logger
 
 from src.database.base_models.pydantic_manager import DataBaseManagerConfig
-from src.database.models import engine, WorkingWallets, WalletsTasks, Forks
+from src.database.models import (
+    engine,
+    WorkingWallets,
+    WalletsTasks,
+    TaskDurations,
+    WalletChecks,
+    ProxyChecks,
+    DepositAddresses,
+    BalanceSnapshots,
+    Forks,
+    ForkLegs,
+    ForkExecutions,
+    Runs,
+)
 
 
 class DataBaseUtils:
@@ -87,11 +102,261 @@ class DataBaseUtils:
                 if self.table_object is WalletsTasks and status == 'completed':
                     await self.check_and_update_working_wallets(private_key, session)
 
+    async def start_run(self, kind: str) -> int:
+        async with self.db_lock:
+            async with self.session() as session:
+                run = Runs(kind=kind, started_at=time.time())
+                session.add(run)
+                await session.commit()
+                return run.id
+
+    async def get_current_run(self, kind: str) -> Optional[int]:
+        async with self.session() as session:
+            query = select(func.max(Runs.id)).where(Runs.kind == kind, Runs.archived_at.is_(None))
+            result = await session.execute(query)
+            return result.scalar()
+
+    async def bulk_add_wallets(
+            self,
+            wallets: list[dict[str, Any]],
+            task_names: list[str],
+            run_id: Optional[int] = None
+    ) -> None:
+        """Inserts wallets and their pending tasks in a single transaction, without per-row lookups."""
+        wallets = [{**wallet, 'run_id': run_id} for wallet in wallets]
+        tasks = [
+            {
+                'private_key': wallet['private_key'],
+                'task_name': task_name,
+                'status': 'pending',
+                'position': position,
+                'run_id': run_id
+            }
+            for wallet in wallets
+            for position, task_name in enumerate(task_names)
+        ]
+        async with self.db_lock:
+            async with self.session() as session:
+                async with session.begin():
+                    # A list of parameter sets is sent as one executemany per table
+                    if wallets:
+                        await session.execute(insert(WorkingWallets), wallets)
+                    if tasks:
+                        await session.execute(insert(WalletsTasks), tasks)
+
+        logger.success(f'✔️ | Added {len(wallets)} wallets and {len(tasks)} tasks to DataBase')
+
+    async def sync_wallets_tables(
+            self,
+            wallets: list[dict[str, Any]],
+            task_names: list[str],
+            run_id: Optional[int] = None
+    ) -> dict[str, int]:
+        """
+        Brings working_wallets and wallets_tasks in line with the given wallets and enabled tasks
+        in a single transaction. Only changed rows are written, completed tasks are never touched:
+        wallets and pending tasks that are no longer configured are retired, not deleted.
+        """
+        changes = dict.fromkeys(
+            ['wallets_added', 'wallets_updated', 'wallets_retired', 'tasks_added', 'tasks_retired'], 0
+        )
+        wallets_by_key = {wallet['private_key']: wallet for wallet in wallets}
+        enabled = set(task_names)
+
+        async with self.db_lock:
+            async with self.session() as session:
+                async with session.begin():
+                    result = await session.execute(
+                        select(WorkingWallets.id, WorkingWallets.private_key, WorkingWallets.proxy,
+                               WorkingWallets.recipient, WorkingWallets.status)
+                    )
+                    existing_wallets = {row.private_key: row for row in result.all()}
+
+                    result = await session.execute(
+                        select(WalletsTasks.id, WalletsTasks.private_key, WalletsTasks.task_name,
+                               WalletsTasks.status, WalletsTasks.position)
+                    )
+                    existing_tasks: dict[str, dict[str, Row]] = {}
+                    for row in result.all():
+                        existing_tasks.setdefault(row.private_key, {})[row.task_name] = row
+
+                    new_wallets, new_tasks, wallet_updates, task_updates = [], [], [], []
+                    for private_key, wallet in wallets_by_key.items():
+                        tasks = existing_tasks.get(private_key, {})
+                        statuses = {}
+                        # Positions follow the enabled modules list, so a newly enabled
+                        # module takes its place in the route instead of running last
+                        for position, task_name in enumerate(task_names):
+                            task = tasks.get(task_name)
+                            if task is None:
+                                new_tasks.append({
+                                    'private_key': private_key,
+                                    'task_name': task_name,
+                                    'status': 'pending',
+                                    'position': position,
+                                    'run_id': run_id
+                                })
+                                changes['tasks_added'] += 1
+                                statuses[task_name] = 'pending'
+                            elif task.status == 'retired':
+                                task_updates.append(
+                                    {'row_id': task.id, 'new_status': 'pending', 'new_position': position}
+                                )
+                                changes['tasks_added'] += 1
+                                statuses[task_name] = 'pending'
+                            else:
+                                if task.status == 'pending' and task.position != position:
+                                    task_updates.append(
+                                        {'row_id': task.id, 'new_status': 'pending', 'new_position': position}
+                                    )
+                                statuses[task_name] = task.status
+
+                        for task_name, task in tasks.items():
+                            if task_name not in enabled and task.status == 'pending':
+                                task_updates.append(
+                                    {'row_id': task.id, 'new_status': 'retired', 'new_position': task.position}
+                                )
+                                changes['tasks_retired'] += 1
+
+                        status = 'pending' if 'pending' in statuses.values() else 'completed'
+                        current = existing_wallets.get(private_key)
+                        if current is None:
+                            new_wallets.append({**wallet, 'status': status, 'run_id': run_id})
+                            changes['wallets_added'] += 1
+                        elif (current.proxy, current.recipient, current.status) != \
+                                (wallet['proxy'], wallet['recipient'], status):
+                            wallet_updates.append({
+                                'row_id': current.id,
+                                'new_proxy': wallet['proxy'],
+                                'new_recipient': wallet['recipient'],
+                                'new_status': status
+                            })
+                            changes['wallets_updated'] += 1
+
+                    retired = [row.id for key, row in existing_wallets.items()
+                               if key not in wallets_by_key and row.status != 'retired']
+                    changes['wallets_retired'] = len(retired)
+
+                    wallets_table = WorkingWallets.__table__
+                    tasks_table = WalletsTasks.__table__
+                    if new_wallets:
+                        await session.execute(insert(WorkingWallets), new_wallets)
+                    if new_tasks:
+                        await session.execute(insert(WalletsTasks), new_tasks)
+                    if wallet_updates:
+                        await session.execute(
+                            update(wallets_table)
+                            .where(wallets_table.c.id == bindparam('row_id'))
+                            .values(
+                                proxy=bindparam('new_proxy'),
+                                recipient=bindparam('new_recipient'),
+                                status=bindparam('new_status')
+                            ),
+                            wallet_updates
+                        )
+                    if task_updates:
+                        await session.execute(
+                            update(tasks_table)
+                            .where(tasks_table.c.id == bindparam('row_id'))
+                            .values(status=bindparam('new_status'), position=bindparam('new_position')),
+                            task_updates
+                        )
+                    if retired:
+                        await session.execute(
+                            update(wallets_table).where(wallets_table.c.id.in_(retired)).values(status='retired')
+                        )
+
+        return changes
+
+    async def write_status_batch(self, task_statuses: list[dict[str, str]], fork_ids: list[int]) -> None:
+        """Applies a batch of task and fork status changes in one transaction."""
+        async with self.db_lock:
+            async with self.session() as session:
+                async with session.begin():
+                    if task_statuses:
+                        # Core table update, so the parameter list runs as one executemany
+                        tasks_table = WalletsTasks.__table__
+                        await session.execute(
+                            update(tasks_table)
+                            .where(
+                                tasks_table.c.private_key == bindparam('key'),
+                                tasks_table.c.task_name == bindparam('task')
+                            )
+                            .values(status=bindparam('new_status')),
+                            [
+                                {'key': task['private_key'], 'task': task['task_name'], 'new_status': task['status']}
+                                for task in task_statuses
+                            ]
+                        )
+
+                        # Wallets without pending tasks left are completed
+                        keys = {task['private_key'] for task in task_statuses if task['status'] == 'completed'}
+                        pending = select(WalletsTasks.id).where(
+                            WalletsTasks.private_key == WorkingWallets.private_key,
+                            WalletsTasks.status == 'pending'
+                        )
+                        await session.execute(
+                            update(WorkingWallets)
+                            .where(WorkingWallets.private_key.in_(keys), ~pending.exists())
+                            .values(status='completed')
+                            .execution_options(synchronize_session=False)
+                        )
+
+                    if fork_ids:
+                        await session.execute(
+                            update(Forks)
+                            .where(Forks.id.in_(fork_ids))
+                            .values(status='completed')
+                            .execution_options(synchronize_session=False)
+                        )
+
     async def get_tasks_info(self, private_key: str) -> tuple[list[str], list[str]]:
         completed_tasks = await self.get_wallet_completed_tasks(private_key)
         uncompleted_tasks = await self.get_wallet_pending_tasks(private_key)
         return completed_tasks, uncompleted_tasks
 
+    async def get_pending_wallets_with_tasks(
+            self,
+            after_id: int = 0,
+            limit: Optional[int] = None
+    ) -> list[tuple[Row, list[str]]]:
+        """
+        Pending wallets with their pending task names, loaded with a single joined and grouped query.
+        Pages are read by keyset: wallets with id greater than `after_id`, at most `limit` of them.
+        """
+        async with self.session() as session:
+            # group_concat has no guaranteed order, so every task name carries its position and row id to sort by
+            query = (
+                select(
+                    WorkingWallets.id,
+                    WorkingWallets.private_key,
+                    WorkingWallets.recipient,
+                    WorkingWallets.proxy,
+                    func.group_concat(
+                        func.coalesce(WalletsTasks.position, 0).concat(':').concat(WalletsTasks.id)
+                        .concat(':').concat(WalletsTasks.task_name)
+                    ).label('task_names')
+                )
+                .outerjoin(
+                    WalletsTasks,
+                    and_(WalletsTasks.private_key == WorkingWallets.private_key, WalletsTasks.status == 'pending')
+                )
+                .filter(WorkingWallets.status == 'pending', WorkingWallets.id > after_id)
+                .group_by(WorkingWallets.id)
+                .order_by(WorkingWallets.id)
+                .limit(limit)
+            )
+            result = await session.execute(query)
+
+        return [(row, self._ordered_task_names(row.task_names)) for row in result.all()]
+
+    @staticmethod
+    def _ordered_task_names(task_names: Optional[str]) -> list[str]:
+        if not task_names:
+            return []
+        tasks = [task.split(':', 2) for task in task_names.split(',')]
+        return [task[2] for task in sorted(tasks, key=lambda task: (int(task[0]), int(task[1])))]
+
     @staticmethod
     async def check_and_update_working_wallets(private_key: str, session) -> None:
         query = select(WalletsTasks).filter_by(private_key=private_key, status='pending')
@@ -117,6 +382,107 @@ class DataBaseUtils:
 
         return wallets
 
+    @staticmethod
+    def _claimable_wallet():
+        return and_(
+            WorkingWallets.status == 'pending',
+            or_(
+                WorkingWallets.lease_owner.is_(None),
+                WorkingWallets.lease_expires_at < time.time()
+            )
+        )
+
+    async def claim_wallet(self, worker_id: str, lease_seconds: int) -> Optional[tuple[WorkingWallets, str]]:
+        lease_token = f'{worker_id}:{uuid.uuid4().hex}'
+
+        async with self.session() as session:
+            while True:
+                candidate = select(WorkingWallets.id).where(self._claimable_wallet()).limit(1).scalar_subquery()
+                query = update(WorkingWallets).where(
+                    WorkingWallets.id == candidate,
+                    self._claimable_wallet()
+                ).values(
+                    lease_owner=lease_token,
+                    lease_expires_at=time.time() + lease_seconds
+                )
+                result = await session.execute(query)
+                await session.commit()
+
+                if result.rowcount:
+                    break
+
+                # Another worker may have taken the candidate first, retry while anything is left to claim
+                result = await session.execute(select(WorkingWallets.id).where(self._claimable_wallet()).limit(1))
+                if result.scalar() is None:
+                    return None
+
+            result = await session.execute(select(WorkingWallets).filter_by(lease_owner=lease_token))
+            return result.scalars().first(), lease_token
+
+    async def claim_wallet_by_key(
+            self,
+            private_key: str,
+            worker_id: str,
+            lease_seconds: int
+    ) -> Optional[tuple[int, str]]:
+        lease_token = f'{worker_id}:{uuid.uuid4().hex}'
+
+        async with self.session() as session:
+            candidate = select(WorkingWallets.id).where(
+                WorkingWallets.private_key == private_key,
+                self._claimable_wallet()
+            ).limit(1).scalar_subquery()
+            query = update(WorkingWallets).where(
+                WorkingWallets.id == candidate,
+                self._claimable_wallet()
+            ).values(
+                lease_owner=lease_token,
+                lease_expires_at=time.time() + lease_seconds
+            )
+            result = await session.execute(query)
+            await session.commit()
+            if not result.rowcount:
+                return None
+
+            result = await session.execute(select(WorkingWallets.id).filter_by(lease_owner=lease_token))
+            return result.scalar(), lease_token
+
+    async def renew_lease(self, wallet_id: int, lease_token: str, lease_seconds: int) -> bool:
+        async with self.session() as session:
+            query = update(WorkingWallets).filter_by(id=wallet_id, lease_owner=lease_token).values(
+                lease_expires_at=time.time() + lease_seconds
+            )
+            result = await session.execute(query)
+            await session.commit()
+            return bool(result.rowcount)
+
+    async def release_lease(self, wallet_id: int, lease_token: str) -> None:
+        """Keeps the lease owner but drops the expiry, so the wallet is not claimed again in this run"""
+        async with self.session() as session:
+            query = update(WorkingWallets).filter_by(id=wallet_id, lease_owner=lease_token).values(
+                lease_expires_at=None
+            )
+            await session.execute(query)
+            await session.commit()
+
+    async def reset_released_leases(self) -> None:
+        async with self.session() as session:
+            query = update(WorkingWallets).where(
+                WorkingWallets.lease_owner.is_not(None),
+                WorkingWallets.lease_expires_at.is_(None)
+            ).values(lease_owner=None)
+            await session.execute(query)
+            await session.commit()
+
+    async def get_leased_wallets_count(self) -> int:
+        async with self.session() as session:
+            query = select(func.count()).select_from(WorkingWallets).where(
+                WorkingWallets.status == 'pending',
+                WorkingWallets.lease_expires_at >= time.time()
+            )
+            result = await session.execute(query)
+            return result.scalar()
+
     async def get_wallet_pending_tasks(self, private_key: str) -> list[str]:
         async with self.session() as session:
             query = select(WalletsTasks).filter_by(private_key=private_key, status='pending')
@@ -141,31 +507,246 @@ class DataBaseUtils:
 
     async def get_total_wallets_count(self) -> int:
         async with self.session() as session:
-            query = select(func.count()).select_from(WorkingWallets)
+            query = select(func.count()).select_from(WorkingWallets).where(WorkingWallets.status != 'retired')
             result = await session.execute(query)
             return result.scalar()
 
-    async def fill_forks_table(self, forks_by_symbol: dict[str, Any]):
+    async def add_task_duration(
+            self,
+            private_key: str,
+            task_name: str,
+            started_at: float,
+            finished_at: float,
+            requests: int,
+            status: str
+    ) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                session.add(
+                    TaskDurations(
+                        private_key=private_key,
+                        task_name=task_name,
+                        started_at=started_at,
+                        finished_at=finished_at,
+                        requests=requests,
+                        status=status
+                    )
+                )
+                await session.commit()
+
+    async def get_task_durations(self) -> dict[str, list[tuple[float, int]]]:
+        async with self.session() as session:
+            # Failed runs are kept, timeouts and exhausted retries are the slowest ones
+            query = select(
+                TaskDurations.task_name,
+                TaskDurations.finished_at - TaskDurations.started_at,
+                TaskDurations.requests
+            )
+            result = await session.execute(query)
+
+            durations = {}
+            for task_name, duration, requests in result.all():
+                durations.setdefault(task_name, []).append((duration, requests))
+
+        return durations
+
+    async def save_wallet_checks(self, checks: list[dict[str, Any]]) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(
+                    delete(WalletChecks).where(WalletChecks.private_key.in_([check['private_key'] for check in checks]))
+                )
+                session.add_all([WalletChecks(**check) for check in checks])
+                await session.commit()
+
+    async def get_failed_wallets(self, max_age: int) -> dict[str, str]:
+        async with self.session() as session:
+            query = select(WalletChecks.private_key, WalletChecks.error).where(
+                or_(WalletChecks.api_ok.is_(False), WalletChecks.proxy_ok.is_(False)),
+                WalletChecks.checked_at >= time.time() - max_age
+            )
+            result = await session.execute(query)
+            return {private_key: error for private_key, error in result.all()}
+
+    async def save_proxy_checks(self, checks: list[dict[str, Any]]) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(
+                    delete(ProxyChecks).where(ProxyChecks.proxy.in_([check['proxy'] for check in checks]))
+                )
+                await session.execute(insert(ProxyChecks), checks)
+                await session.commit()
+
+    async def get_proxy_checks(self, max_age: int) -> dict[str, bool]:
+        async with self.session() as session:
+            query = select(ProxyChecks.proxy, ProxyChecks.ok).where(
+                ProxyChecks.checked_at >= time.time() - max_age
+            )
+            result = await session.execute(query)
+            return {proxy: ok for proxy, ok in result.all()}
+
+    async def save_deposit_addresses(self, addresses: dict[str, str], chain: str) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(
+                    delete(DepositAddresses).where(
+                        DepositAddresses.chain == chain,
+                        DepositAddresses.private_key.in_(list(addresses))
+                    )
+                )
+                fetched_at = time.time()
+                session.add_all([
+                    DepositAddresses(private_key=private_key, chain=chain, address=address, fetched_at=fetched_at)
+                    for private_key, address in addresses.items()
+                ])
+                await session.commit()
+
+    async def get_deposit_addresses(self, chain: str) -> dict[str, str]:
+        async with self.session() as session:
+            query = select(DepositAddresses.private_key, DepositAddresses.address).filter_by(chain=chain)
+            result = await session.execute(query)
+            return dict(result.all())
+
+    async def get_deposit_address(self, private_key: str, chain: str) -> Optional[str]:
+        async with self.session() as session:
+            query = select(DepositAddresses.address).filter_by(private_key=private_key, chain=chain)
+            result = await session.execute(query)
+            return result.scalars().first()
+
+    async def save_balance_snapshots(self, balances: dict[str, dict[str, float]]) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(
+                    delete(BalanceSnapshots).where(BalanceSnapshots.private_key.in_(list(balances)))
+                )
+                fetched_at = time.time()
+                session.add_all([
+                    BalanceSnapshots(private_key=private_key, symbol=symbol, available=available, fetched_at=fetched_at)
+                    for private_key, symbols in balances.items()
+                    for symbol, available in symbols.items()
+                ])
+                await session.commit()
+
+    async def get_balance_snapshots(
+            self,
+            symbol: str,
+            max_age: int,
+            private_key: str | None = None
+    ) -> dict[str, float]:
+        async with self.session() as session:
+            query = select(BalanceSnapshots.private_key, BalanceSnapshots.available).where(
+                BalanceSnapshots.symbol == symbol,
+                BalanceSnapshots.fetched_at >= time.time() - max_age
+            )
+            if private_key:
+                query = query.filter_by(private_key=private_key)
+            result = await session.execute(query)
+            return dict(result.all())
+
+    async def delete_balance_snapshots(self, private_key: str) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(delete(BalanceSnapshots).filter_by(private_key=private_key))
+                await session.commit()
+
+    @staticmethod
+    def _fork_legs(
+            fork_id: int,
+            symbol: str,
+            long: list[dict],
+            short: list[dict],
+            run_id: Optional[int] = None
+    ) -> list[ForkLegs]:
+        return [
+            ForkLegs(
+                fork_id=fork_id,
+                private_key=position['account'],
+                symbol=symbol,
+                side=side,
+                base_size=position['base_size'],
+                total_size=position['total_size'],
+                leverage=position['leverage'],
+                filled_quantity=0,
+                status='pending',
+                run_id=run_id
+            )
+            for side, positions in (('Bid', long), ('Ask', short))
+            for position in positions
+        ]
+
+    async def fill_forks_table(self, fork_groups: list[dict[str, Any]], run_id: Optional[int] = None):
         async with self.db_lock:
             async with self.session() as session:
                 await session.execute(delete(Forks))
+                await session.execute(delete(ForkLegs))
 
-                for symbol, data in forks_by_symbol.items():
+                for data in fork_groups:
                     fork_entry = Forks(
-                        symbol=symbol,
+                        symbol=data['symbol'],
                         accounts=data['accounts'],
-                        forks={
-                            'long': data['long'],
-                            'short': data['short']
-                        },
-                        status='pending'
+                        status='pending',
+                        run_id=run_id
                     )
                     session.add(fork_entry)
+                    await session.flush()
+                    session.add_all(
+                        self._fork_legs(fork_entry.id, data['symbol'], data['long'], data['short'], run_id)
+                    )
 
-                    logger.success(f'Added {symbol} forks data')
+                await session.commit()
+
+        logger.success(f'Added {len(fork_groups)} forks to DataBase')
 
+    async def backfill_fork_legs(self) -> None:
+        """Moves legs of forks created before the fork_legs table out of the JSON column."""
+        async with self.db_lock:
+            async with self.session() as session:
+                with_legs = select(ForkLegs.fork_id).distinct()
+                query = select(Forks).where(Forks.id.not_in(with_legs))
+                result = await session.execute(query)
+                forks = [fork for fork in result.scalars().all() if fork.forks]
+
+                for fork in forks:
+                    session.add_all(
+                        self._fork_legs(fork.id, fork.symbol, fork.forks['long'], fork.forks['short'], fork.run_id)
+                    )
+                    logger.info(f'Moved {fork.symbol} fork legs to fork_legs table')
+
+                if forks:
                     await session.commit()
 
+    async def get_fork_legs(self, fork_ids: list[int]) -> list[ForkLegs]:
+        async with self.session() as session:
+            query = select(ForkLegs).where(ForkLegs.fork_id.in_(fork_ids)).order_by(ForkLegs.id)
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    async def get_account_legs(self, private_key: str) -> list[ForkLegs]:
+        async with self.session() as session:
+            query = select(ForkLegs).filter_by(private_key=private_key).order_by(ForkLegs.id)
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    async def update_fork_legs(self, legs: list[dict[str, Any]]) -> None:
+        """Writes the state of several legs in one transaction, fill price and order id are kept when not set."""
+        legs_table = ForkLegs.__table__
+        async with self.db_lock:
+            async with self.session() as session:
+                await session.execute(
+                    update(legs_table)
+                    .where(legs_table.c.id == bindparam('leg_id'))
+                    .values(
+                        quantity=bindparam('new_quantity'),
+                        filled_quantity=bindparam('new_filled_quantity'),
+                        status=bindparam('new_status'),
+                        fill_price=func.coalesce(bindparam('new_fill_price'), legs_table.c.fill_price),
+                        order_id=func.coalesce(bindparam('new_order_id'), legs_table.c.order_id),
+                        updated_at=time.time()
+                    ),
+                    legs
+                )
+                await session.commit()
+
     async def get_uncompleted_forks(self):
         async with self.session() as session:
             query = select(Forks).filter_by(status='pending')
@@ -174,6 +755,14 @@ class DataBaseUtils:
 
         return wallets
 
+    async def get_forks(self, statuses: list[str]):
+        async with self.session() as session:
+            query = select(Forks).where(Forks.status.in_(statuses))
+            result = await session.execute(query)
+            forks = result.scalars().all()
+
+        return forks
+
     async def update_fork_status(self, task_id: int):
         query = select(Forks).filter_by(id=task_id)
         async with self.db_lock:
@@ -185,3 +774,14 @@ class DataBaseUtils:
                     existing_entry.status = 'completed'
                     logger.info(f'🔄 | Updated existing entry for fork id: {task_id}')
                     await session.commit()
+
+    async def add_fork_executions(self, executions: list[dict[str, Any]]) -> None:
+        async with self.db_lock:
+            async with self.session() as session:
+                session.add_all([ForkExecutions(**execution) for execution in executions])
+                await session.commit()
+
+    async def get_fork_executions(self) -> list[ForkExecutions]:
+        async with self.session() as session:
+            result = await session.execute(select(ForkExecutions))
+            return result.scalars().all()
@@ -35,3 +35,27 @@ class Wallet(BaseModel):
 class Route(BaseModel):
     tasks: List[str]
     wallet: Wallet
+
+
+class RouteRecord:
+    """
+    Compact pending route as read from the database.
+    The pydantic Route (and the wallet's Proxy) is built only when the wallet starts.
+    """
+    __slots__ = ('private_key', 'recipient', 'proxy', 'tasks')
+
+    def __init__(self, private_key: str, recipient: str | None, proxy: str | None, tasks: tuple[str, ...]) -> None:
+        self.private_key = private_key
+        self.recipient = recipient
+        self.proxy = proxy
+        self.tasks = tasks
+
+    def to_route(self) -> Route:
+        return Route(
+            tasks=list(self.tasks),
+            wallet=Wallet(
+                private_key=self.private_key,
+                recipient=self.recipient,
+                proxy=self.proxy,
+            )
+        )
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from src.modules.backpack.backpack_account import BackpackAccount
+from src.utils.proxy_manager import Proxy
+
+
+class AccountPool:
+    """Keeps one BackpackAccount (and its HTTP session) per API key, so modules reuse open connections"""
+
+    def __init__(self) -> None:
+        self.accounts: dict[str, BackpackAccount] = {}
+
+    def get(self, private_key: str, proxy: Optional[Proxy] = None) -> BackpackAccount:
+        account = self.accounts.get(private_key)
+        if account is None:
+            account = BackpackAccount(
+                proxy=proxy,
+                api_key=private_key
+            )
+            account.affinity_key = private_key
+            self.accounts[private_key] = account
+        return account
+
+    async def release(self, private_key: str) -> None:
+        account = self.accounts.pop(private_key, None)
+        if account and account.session:
+            await account.session.close()
+
+    async def close(self) -> None:
+        for private_key in list(self.accounts):
+            await self.release(private_key)
+
+
+account_pool = AccountPool()
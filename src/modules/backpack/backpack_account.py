@@ -233,6 +233,19 @@ class BackpackAccount(BackpackClient):
     async def _get_limit_data(self, symbol: str, amount_usd: float, side: Literal['Ask', 'Bid']) -> Tuple[str, str]:
         depth = await self.get_order_book_depth(symbol)
 
+        token_decimals = await self.get_token_decimals(symbol)
+        if token_decimals is None:
+            token_decimals = 8
+
+        return self.limit_data_from_depth(depth, amount_usd, side, token_decimals)
+
+    @staticmethod
+    def limit_data_from_depth(
+            depth: Dict[str, Any],
+            amount_usd: float,
+            side: Literal['Ask', 'Bid'],
+            token_decimals: int
+    ) -> Tuple[str, str]:
         if side == 'Bid':
             book_side = 'asks'
             price = depth[book_side][0][0]
@@ -240,10 +253,6 @@ class BackpackAccount(BackpackClient):
             book_side = 'bids'
             price = depth[book_side][-1][0]
 
-        token_decimals = await self.get_token_decimals(symbol)
-        if token_decimals is None:
-            token_decimals = 8
-
         amount = amount_usd / float(price)
         amount = str(round(amount * (10 ** token_decimals)) / (10 ** token_decimals))
 
@@ -306,6 +315,27 @@ class BackpackAccount(BackpackClient):
             self.logger.warning(f'{self.public_key_b64}: order failed to fill - order details: {order}')
             return 0
 
+    async def post_market_order(
+            self,
+            symbol: str,
+            side: Literal['Bid', 'Ask'],
+            quantity: str,
+            reduce_only: bool = False,
+            time_in_force: Literal['IOC', 'FOK', 'GTC'] = 'GTC'
+    ) -> Dict[str, Any]:
+        url_path = 'api/v1/order'
+
+        payload = {
+            'orderType': 'Market',
+            'quantity': quantity,
+            'side': side,
+            'symbol': symbol,
+            'timeInForce': time_in_force,
+            'reduceOnly': reduce_only,
+        }
+
+        return await self._query('orderExecute', 'post', url_path, payload, payload)
+
     async def close_futures_pos(
             self,
             symbol: str,
@@ -1,3 +1,4 @@
+import time
 from decimal import Decimal
 from typing import Optional, List, TypedDict, cast, Dict, Any, Tuple
 
@@ -14,6 +15,10 @@ class OrderBookResponse(TypedDict):
 
 
 class BackpackClient(RequestClient):
+    markets_ttl = 300
+    _markets_cache: Optional[List[Dict[str, Any]]] = None
+    _markets_fetched_at: float = 0.0
+
     def __init__(
             self,
             proxy: Optional[Proxy] = None,
@@ -71,16 +76,21 @@ class BackpackClient(RequestClient):
                 self.logger.warning(f"No asks in order book for {symbol}")
                 return None
 
-            amount = order_book['asks'][0][1]
-
-            decimals = len(str(amount).split('.')[1]) if '.' in str(amount) else 0
-            return decimals
+            return self.decimals_from_order_book(order_book)
 
         except (IndexError, KeyError, TypeError, ValueError) as ex:
             self.logger.error(f"Error determining decimals for {symbol}: {ex}")
             return None
 
+    @staticmethod
+    def decimals_from_order_book(order_book: OrderBookResponse) -> int:
+        amount = order_book['asks'][0][1]
+        return len(str(amount).split('.')[1]) if '.' in str(amount) else 0
+
     async def get_markets(self) -> List[Dict[str, Any]]:
+        if BackpackClient._markets_cache and time.time() - BackpackClient._markets_fetched_at < self.markets_ttl:
+            return BackpackClient._markets_cache
+
         url = f'{self.backpack_api_url}api/v1/markets'
 
         response, status = await self.make_request(
@@ -96,6 +106,8 @@ class BackpackClient(RequestClient):
             usdc_markets = [market for market in response if market.get('quoteSymbol') == 'USDC']
 
             self.logger.info(f"Found {len(usdc_markets)} USDC markets")
+            BackpackClient._markets_cache = usdc_markets
+            BackpackClient._markets_fetched_at = time.time()
             return usdc_markets
         except Exception as ex:
             self.logger.error(f"Error parsing markets data: {ex}")
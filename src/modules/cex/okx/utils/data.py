@@ -1,29 +1,110 @@
+import json
+import os
+import time
+from threading import Lock
 from typing import Optional
 
 from loguru import logger
 import ccxt
 
+from config import OKX_CURRENCIES_TTL, OKX_CURRENCIES_CACHE_PATH
+
+
+class CurrencyCache:
+    """
+    Withdrawal networks of every OKX currency, keyed by symbol and network id ('USDC-Solana').
+    Shared by all OKX instances, refreshed after the TTL and kept on disk so a restart skips the fetch.
+    """
+
+    def __init__(self, path: str, ttl: int) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.networks: dict[str, dict[str, dict]] = {}
+        self.fetched_at = 0.0
+        # Networks still missing after a refresh, not fetched again until the next TTL refresh
+        self.misses: set[tuple[str, str]] = set()
+        self.lock = Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            self.networks = data['networks']
+            self.fetched_at = data['fetched_at']
+        except FileNotFoundError:
+            pass
+        except Exception as ex:
+            logger.warning(f'Failed to load OKX currencies cache: {ex}')
+
+    def _save(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'networks': self.networks, 'fetched_at': self.fetched_at}, file)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, exchange: ccxt.okx) -> None:
+        currencies = exchange.fetch_currencies()
+        self.networks = {
+            symbol: {
+                network['id']: {
+                    'fee': network.get('fee'),
+                    'withdraw': network.get('withdraw'),
+                    'min_withdraw': ((network.get('limits') or {}).get('withdraw') or {}).get('min'),
+                }
+                for network in (currency.get('networks') or {}).values()
+            }
+            for symbol, currency in currencies.items()
+        }
+        self.fetched_at = time.time()
+        self.misses.clear()
+        try:
+            self._save()
+        except Exception as ex:
+            logger.warning(f'Failed to save OKX currencies cache: {ex}')
+
+    def get(self, symbol: str, network_id: str, exchange: ccxt.okx) -> Optional[dict]:
+        with self.lock:
+            refreshed = time.time() - self.fetched_at >= self.ttl
+            if refreshed:
+                self._refresh_or_keep(exchange)
+
+            network = self.networks.get(symbol, {}).get(network_id)
+            if network is not None or (symbol, network_id) in self.misses:
+                return network
+
+            # A missing network may have been listed since the last fetch, it is looked up once per TTL
+            if not refreshed:
+                self._refresh_or_keep(exchange)
+                network = self.networks.get(symbol, {}).get(network_id)
+            if network is None:
+                self.misses.add((symbol, network_id))
+                logger.warning(f'OKX has no {network_id} network for {symbol}, not checking again '
+                               f'for {self.ttl} seconds')
+
+        return network
+
+    def _refresh_or_keep(self, exchange: ccxt.okx) -> None:
+        try:
+            self.refresh(exchange)
+        except Exception as ex:
+            if not self.networks:
+                raise
+            logger.warning(f'Failed to refresh OKX currencies, using cached data: {ex}')
+
+
+currency_cache = CurrencyCache(OKX_CURRENCIES_CACHE_PATH, OKX_CURRENCIES_TTL)
+
 
 def get_withdrawal_fee(symbol_withdraw: str, chain_name: str, exchange: ccxt.okx) -> Optional[float]:
-    currencies = exchange.fetch_currencies()
-    for currency in currencies:
-        if currency == symbol_withdraw:
-            currency_info = currencies[currency]
-            network_info = currency_info.get('networks', None)
-            if network_info:
-                for network in network_info:
-                    network_data = network_info[network]
-                    network_id = network_data['id']
-
-                    if network_id == chain_name:
-                        withdrawal_fee = currency_info['networks'][network]['fee']
-
-                        if withdrawal_fee == 0:
-                            return 0
-                        else:
-                            return str(withdrawal_fee) if withdrawal_fee is not None else None
+    network = currency_cache.get(symbol_withdraw, chain_name, exchange)
+    if network:
+        withdrawal_fee = network['fee']
+
+        if withdrawal_fee == 0:
+            return 0
+        else:
+            return str(withdrawal_fee) if withdrawal_fee is not None else None
 
     logger.error(f"Can't get commission value, check symbolWithdraw and network values")
     return
-
-
@@ -6,11 +6,12 @@ from typing import Callable, Optional
 import ccxt
 from loguru import logger
 
-from config import RETRIES, PAUSE_BETWEEN_RETRIES, OKXWithdrawSettings
+from config import RETRIES, PAUSE_BETWEEN_RETRIES, BALANCE_SNAPSHOT_TTL, OKXWithdrawSettings
 from src.models.cex import CEXConfig
 from src.modules.backpack.backpack_account import BackpackAccount
 from src.utils.proxy_manager import Proxy
 from src.utils.request_client.client import RequestClient
+from src.utils.balance_snapshots import get_snapshot_balance
 
 from src.utils.common.wrappers.decorators import retry
 
@@ -33,6 +34,7 @@ class CEX(ABC, BackpackAccount, RequestClient):
         self.password = None
         self.proxy = None
         self.exchange_instance = None
+        self.private_key = private_key
 
         self.config = config
         if config.okx_config:
@@ -72,6 +74,8 @@ class CEX(ABC, BackpackAccount, RequestClient):
             self.token, self.api_key, self.api_secret, self.passphrase, self.password, self.make_request
         )
         await sleep(10)
+        # The snapshot only decides whether to skip, the arrival check needs the live balance
+        balance_before_withdraw = await self.get_balances("USDC")
         withdrawn = self.call_withdraw(self.exchange_instance)
         if withdrawn:
             await self.wait_for_withdrawal(balance_before_withdraw)
@@ -130,6 +134,10 @@ class CEX(ABC, BackpackAccount, RequestClient):
                 continue
 
     async def get_balance_before_withdrawal(self) -> float:
+        usdc_balance = await get_snapshot_balance(self.private_key, "USDC", BALANCE_SNAPSHOT_TTL)
+        if usdc_balance is not None:
+            return usdc_balance
+
         usdc_balance = await self.get_balances("USDC")
         return usdc_balance
 
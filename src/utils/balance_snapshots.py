@@ -0,0 +1,96 @@
+from asyncio import Semaphore, gather
+from typing import Optional
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.modules.backpack.account_pool import account_pool
+from src.utils.data.wallet_registry import WalletRegistry
+from src.utils.rate_limiter import RateLimiter
+
+
+def get_db_utils() -> DataBaseUtils:
+    return DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='balance_snapshots'
+        )
+    )
+
+
+async def refresh_balances(
+        private_keys: list[str],
+        wallet_registry: WalletRegistry,
+        concurrency: int,
+        rate: float
+) -> dict[str, dict[str, float]]:
+    semaphore = Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+
+    async def fetch(private_key: str) -> Optional[tuple[str, dict[str, float]]]:
+        pooled = private_key in account_pool.accounts
+        async with semaphore:
+            try:
+                backpack = account_pool.get(private_key=private_key, proxy=wallet_registry.proxy_of(private_key))
+                async with limiter:
+                    balances = await backpack._query('balanceQuery', 'get', 'api/v1/capital')
+                symbols = {symbol: float(balance['available']) for symbol, balance in (balances or {}).items()}
+                symbols.setdefault('USDC', 0.0)
+                return private_key, symbols
+            except Exception as ex:
+                logger.error(f'Failed to get balances for wallet {private_key[:4]}...{private_key[-4:]}: {ex}')
+            finally:
+                if not pooled:
+                    await account_pool.release(private_key)
+
+    snapshots = dict(result for result in await gather(*[fetch(key) for key in private_keys]) if result)
+    if snapshots:
+        await get_db_utils().save_balance_snapshots(snapshots)
+
+    logger.info(f'Balance snapshots refreshed for {len(snapshots)}/{len(private_keys)} wallets')
+    return snapshots
+
+
+async def get_balances(
+        private_keys: list[str],
+        wallet_registry: WalletRegistry,
+        symbol: str,
+        max_age: int,
+        concurrency: int,
+        rate: float
+) -> dict[str, float]:
+    """Balances from snapshots not older than max_age, stale or missing wallets are re-fetched concurrently"""
+    snapshots = await get_db_utils().get_balance_snapshots(symbol, max_age)
+    balances = {private_key: snapshots[private_key] for private_key in private_keys if private_key in snapshots}
+
+    stale = [private_key for private_key in private_keys if private_key not in balances]
+    if stale:
+        refreshed = await refresh_balances(stale, wallet_registry, concurrency, rate)
+        for private_key, symbols in refreshed.items():
+            balances[private_key] = symbols.get(symbol, 0.0)
+
+    return balances
+
+
+async def get_snapshot_balance(private_key: str, symbol: str, max_age: int) -> Optional[float]:
+    snapshots = await get_db_utils().get_balance_snapshots(symbol, max_age, private_key)
+    return snapshots.get(private_key)
+
+
+async def invalidate_balance(private_key: str) -> None:
+    await get_db_utils().delete_balance_snapshots(private_key)
+
+
+async def print_balances_report(
+        wallet_registry: WalletRegistry,
+        max_age: int,
+        concurrency: int,
+        rate: float
+) -> None:
+    balances = await get_balances(wallet_registry.private_keys, wallet_registry, 'USDC', max_age, concurrency, rate)
+
+    print(f"\n{'Wallet':<16}{'USDC':>14}")
+    for private_key in wallet_registry.private_keys:
+        balance = balances.get(private_key)
+        print(f"{private_key[:4] + '...' + private_key[-4:]:<16}{'-' if balance is None else round(balance, 2):>14}")
+    print(f"{'Total':<16}{round(sum(balances.values()), 2):>14}")
@@ -10,3 +10,14 @@ module_handlers = {
     'GET_TICKERS': process_get_usdc_symbols,
     'RANDOM_SWAPS': process_random_swaps,
 }
+
+module_stages = {
+    'OKX_WITHDRAW': 'withdraw',
+    'OKX_DEPOSIT': 'deposit',
+    'BACKPACK_FUTURES': 'trading',
+    'BACKPACK_SPOT': 'trading',
+    'CLOSE_ALL': 'trading',
+    'SWAP_ALL_TO_USDC': 'trading',
+    'GET_TICKERS': 'trading',
+    'RANDOM_SWAPS': 'trading',
+}
@@ -0,0 +1,72 @@
+from loguru import logger
+
+from src.utils.proxy_manager import Proxy
+
+
+class WalletRegistry:
+    """
+    Wallets from wallets.txt indexed once at startup.
+    Proxy and recipient are paired with a wallet by its line number, proxies are reused round-robin.
+    """
+
+    def __init__(
+            self,
+            private_keys: list[str],
+            proxies: list[str | None],
+            recipients: list[str | None],
+            mobile_proxy: bool = False
+    ) -> None:
+        self.private_keys: list[str] = []
+        self.mobile_proxy = mobile_proxy
+        self.index_by_key: dict[str, int] = {}
+        self.proxy_by_key: dict[str, str | None] = {}
+        self.recipient_by_key: dict[str, str | None] = {}
+        self.duplicates: list[str] = []
+
+        proxies = [proxy or None for proxy in proxies] or [None]
+        for index, private_key in enumerate(private_keys):
+            if not private_key:
+                continue
+
+            if private_key in self.index_by_key:
+                self.duplicates.append(private_key)
+                logger.warning(
+                    f'Duplicate wallet {private_key[:4]}...{private_key[-4:]} on line {index + 1}, '
+                    f'using line {self.index_by_key[private_key] + 1}'
+                )
+                continue
+
+            self.private_keys.append(private_key)
+            self.index_by_key[private_key] = index
+            self.proxy_by_key[private_key] = proxies[index % len(proxies)]
+            self.recipient_by_key[private_key] = recipients[index] or None if index < len(recipients) else None
+
+    def __contains__(self, private_key: str) -> bool:
+        return private_key in self.index_by_key
+
+    def __len__(self) -> int:
+        return len(self.private_keys)
+
+    def index_of(self, private_key: str) -> int:
+        return self.index_by_key[private_key]
+
+    def raw_proxy_of(self, private_key: str) -> str | None:
+        """Proxy line as stored in the database: 'login:pass@ip:port' or 'login:pass@ip:port|change_link'"""
+        return self.proxy_by_key.get(private_key)
+
+    def proxy_of(self, private_key: str) -> Proxy | None:
+        proxy = self.raw_proxy_of(private_key)
+        if not proxy:
+            return None
+
+        change_link = None
+        if self.mobile_proxy:
+            proxy, change_link = proxy.split('|')
+
+        return Proxy(proxy_url=f'http://{proxy}', change_link=change_link)
+
+    def recipient_of(self, private_key: str) -> str | None:
+        return self.recipient_by_key.get(private_key)
+
+    def has_all_recipients(self, private_keys: list[str]) -> bool:
+        return all(self.recipient_of(private_key) for private_key in private_keys)
@@ -0,0 +1,152 @@
+import numpy as np
+
+MAX_LEVERAGE = 5.0
+MIN_SHORTS, MAX_SHORTS = 2, 5
+AVG_ACCOUNTS_PER_GROUP = 5
+MIN_SHORT_CENTS = 10  # Keeps the margin of the smallest short at a cent or more at any leverage
+
+
+def _group_sizes(total_accounts: int, rng: np.random.Generator) -> np.ndarray:
+    num_groups = max(1, total_accounts // AVG_ACCOUNTS_PER_GROUP)
+    sizes = 1 + rng.integers(MIN_SHORTS, MAX_SHORTS + 1, num_groups)
+
+    # Shrink the largest groups until every group fits into the available accounts
+    excess = sizes.sum() - total_accounts
+    while excess > 0:
+        shrinkable = np.flatnonzero(sizes > 1 + MIN_SHORTS)
+        take = shrinkable[np.argsort(-sizes[shrinkable], kind='stable')][:excess]
+        sizes[take] -= 1
+        excess = sizes.sum() - total_accounts
+
+    return sizes
+
+
+def create_delta_neutral_strategy(
+        balances: dict[str, float],
+        symbols: list[str],
+        seed: int | None = None,
+        max_leverage: float = MAX_LEVERAGE
+) -> list[dict]:
+    """
+    Splits accounts into groups of one long and 2-5 shorts and sizes every leg so that the shorts
+    of a group add up to the long to the cent. The shorts are proportional to balance, leverage stays
+    within max_leverage, and no two shorts of a group get the same size.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Balances below the smallest short cannot carry a leg
+    tradable = {
+        account: balance for account, balance in balances.items() if balance and balance >= MIN_SHORT_CENTS / 100
+    }
+    accounts = np.array(list(tradable))
+    values = np.array(list(tradable.values()), dtype=float)
+    if len(accounts) < 1 + MIN_SHORTS:
+        return []
+
+    sizes = _group_sizes(len(accounts), rng)
+    order = rng.permutation(len(accounts))[:sizes.sum()]
+    accounts, values = accounts[order], values[order]
+
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    is_long = np.zeros(len(group), dtype=bool)
+    is_long[starts] = True
+    short = ~is_long
+
+    # Long legs in whole dollars of margin (never above the balance), clamped to what the shorts can carry
+    long_balance = values[starts]
+    long_leverage = rng.integers(2, 6, len(sizes)).astype(float)
+    short_capacity = np.bincount(group[short], weights=values[short], minlength=len(sizes))
+    long_margin = np.minimum(np.round(long_balance * rng.uniform(0.65, 0.75, len(sizes))), np.floor(long_balance))
+    long_total = long_margin * long_leverage
+    long_total = np.minimum(long_total, np.floor(short_capacity * max_leverage * 0.95))
+    long_cents = np.round(long_total * 100).astype(np.int64)
+
+    # Groups too small to give every short a distinct size of at least MIN_SHORT_CENTS are left out
+    shorts = sizes - 1
+    keep = long_cents > shorts * MIN_SHORT_CENTS + shorts * (shorts - 1) // 2
+    if not keep.all():
+        members = keep[group]
+        accounts, values = accounts[members], values[members]
+        sizes, long_leverage = sizes[keep], long_leverage[keep]
+        long_total, long_cents, short_capacity = long_total[keep], long_cents[keep], short_capacity[keep]
+        if not len(sizes):
+            return []
+
+        group = np.repeat(np.arange(len(sizes)), sizes)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        is_long = np.zeros(len(group), dtype=bool)
+        is_long[starts] = True
+        short = ~is_long
+
+    # Short legs proportional to balance, with zero-sum jitter so sizes differ. Every leg's jitter
+    # is centered in proportion to its own amplitude (at most 50 cents or 2% of the leg), so small legs
+    # stay within their balance
+    short_group = group[short]
+    short_values = values[short]
+    target = long_total[short_group] * short_values / short_capacity[short_group]
+    amplitude = np.minimum(0.5, target * 0.02)
+    jitter = rng.uniform(-0.5, 0.5, len(target)) * amplitude
+    jitter -= amplitude * (
+        np.bincount(short_group, weights=jitter) / np.bincount(short_group, weights=amplitude)
+    )[short_group]
+    short_cents = np.maximum(np.floor((target + jitter) * 100).astype(np.int64), MIN_SHORT_CENTS)
+
+    first_short = np.concatenate(([0], np.cumsum(sizes - 1)[:-1]))
+    by_size = np.lexsort((short_cents, short_group))
+    cents, cents_group = short_cents[by_size], short_group[by_size]
+    rank = np.arange(len(cents)) - first_short[cents_group]
+
+    # Strictly increasing sizes within each group, the smallest at MIN_SHORT_CENTS or more:
+    # a running maximum of (size - rank) per group, kept apart by a per-group offset
+    offset = (cents.max() + len(cents) + MIN_SHORT_CENTS) * cents_group
+    floor = np.maximum.accumulate(np.maximum(cents - rank, MIN_SHORT_CENTS) + offset) - offset
+    cents = floor + rank
+
+    # Put the rounding residual on the largest shorts, so the group delta is exactly zero.
+    # A surplus goes to the largest one, a deficit is taken from the top down without breaking the order
+    residual = long_cents - np.bincount(cents_group, weights=cents, minlength=len(sizes)).astype(np.int64)
+    last = first_short + sizes - 2
+    cents[last] += np.maximum(residual, 0)
+    deficit = np.maximum(-residual, 0)
+    for step in range(sizes.max() - 1):
+        has = sizes - 1 > step
+        index = (last - step)[has]
+        lower = np.where(index > first_short[has], cents[np.maximum(index - 1, 0)] + 1, MIN_SHORT_CENTS)
+        taken = np.minimum(deficit[has], cents[index] - lower)
+        cents[index] -= taken
+        deficit[has] -= taken
+    short_cents[by_size] = cents
+
+    short_total = short_cents / 100
+    short_leverage = np.clip(
+        np.maximum(rng.uniform(2, 3, len(short_total)), short_total / short_values),
+        None, max_leverage
+    )
+
+    group_symbols = np.array([f'{symbol}_USDC_PERP' for symbol in symbols])[rng.integers(0, len(symbols), len(sizes))]
+
+    positions = []
+    short_index = np.flatnonzero(short)
+    for index in range(len(sizes)):
+        symbol = str(group_symbols[index])
+        positions.append({
+            "symbol": symbol,
+            "account": str(accounts[starts[index]]),
+            "direction": "long",
+            "base_size": round(float(long_cents[index] / 100 / long_leverage[index]), 2),
+            "leverage": int(long_leverage[index]),
+            "total_size": float(long_cents[index] / 100)
+        })
+
+        for position in range(first_short[index], first_short[index] + sizes[index] - 1):
+            positions.append({
+                "symbol": symbol,
+                "account": str(accounts[short_index[position]]),
+                "direction": "short",
+                "base_size": round(float(short_total[position] / short_leverage[position]), 2),
+                "leverage": round(float(short_leverage[position]), 2),
+                "total_size": float(short_total[position])
+            })
+
+    return positions
@@ -0,0 +1,73 @@
+from asyncio import Semaphore, gather
+from typing import Optional
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.modules.backpack.account_pool import AccountPool
+from src.modules.backpack.backpack_account import BackpackAccount
+from src.utils.data.wallet_registry import WalletRegistry
+from src.utils.rate_limiter import RateLimiter
+
+
+def get_db_utils() -> DataBaseUtils:
+    return DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='deposit_addresses'
+        )
+    )
+
+
+async def fetch_deposit_addresses(
+        api_keys: list[str],
+        wallet_registry: WalletRegistry,
+        concurrency: int,
+        rate: float,
+        chain: str = 'Solana'
+) -> dict[str, str]:
+    db_utils = get_db_utils()
+    addresses = await db_utils.get_deposit_addresses(chain)
+    missing = [api_key for api_key in api_keys if api_key not in addresses]
+    logger.info(f'{len(api_keys) - len(missing)} deposit addresses already stored, fetching {len(missing)}')
+
+    semaphore = Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    accounts = AccountPool()
+
+    async def fetch(index: int, api_key: str) -> Optional[tuple[str, str]]:
+        shortened_key = api_key[:6] + '...' + api_key[-4:]
+        async with semaphore:
+            try:
+                backpack = accounts.get(private_key=api_key, proxy=wallet_registry.proxy_of(api_key))
+                async with limiter:
+                    address = await backpack.get_deposit_address(chain=chain)
+                logger.success(
+                    f"[{index + 1}/{len(missing)}] Retrieved {chain} deposit address for {shortened_key}: {address}"
+                )
+                return api_key, address
+            except Exception as ex:
+                logger.error(f"[{index + 1}/{len(missing)}] Failed to get deposit address for key {shortened_key}: {ex}")
+            finally:
+                await accounts.release(api_key)
+
+    fetched = dict(result for result in await gather(*[
+        fetch(index, api_key) for index, api_key in enumerate(missing)
+    ]) if result)
+
+    if fetched:
+        await db_utils.save_deposit_addresses(fetched, chain)
+        addresses.update(fetched)
+
+    return {api_key: addresses[api_key] for api_key in api_keys if api_key in addresses}
+
+
+async def get_deposit_address(backpack: BackpackAccount, private_key: str, chain: str = 'Solana') -> str:
+    db_utils = get_db_utils()
+    address = await db_utils.get_deposit_address(private_key, chain)
+    if address:
+        return address
+
+    address = await backpack.get_deposit_address(chain=chain)
+    await db_utils.save_deposit_addresses({private_key: address}, chain)
+    return address
@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.utils.stats import percentile
+
+
+async def print_fork_executions_report() -> None:
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='fork_executions'
+        )
+    )
+    executions = await db_utils.get_fork_executions()
+    if not executions:
+        logger.info('No fork executions recorded yet')
+        return
+
+    by_execution = defaultdict(list)
+    for execution in executions:
+        by_execution[execution.execution_id].append(execution)
+
+    # A fork is hedged when its last leg is filled, unfilled legs leave the hedge incomplete
+    completion_times = []
+    for legs in by_execution.values():
+        if all(leg.fill_at is not None for leg in legs):
+            completion_times.append(max(leg.fill_at for leg in legs) - min(leg.submit_at for leg in legs))
+
+    print(f"\n{'Metric':<28}{'Count':>8}{'p50':>12}{'p95':>12}")
+    print(
+        f"{'Hedge completion, s':<28}{len(completion_times):>8}"
+        f"{percentile(completion_times, 50):>12.3f}{percentile(completion_times, 95):>12.3f}"
+    )
+
+    for kind in ('open', 'top_up', 'unwind'):
+        acks = [leg.ack_at - leg.submit_at for leg in executions if leg.kind == kind and leg.ack_at is not None]
+        slippages = [leg.slippage_bps for leg in executions if leg.kind == kind and leg.slippage_bps is not None]
+        if not acks:
+            continue
+        print(f"{f'{kind} ack latency, s':<28}{len(acks):>8}{percentile(acks, 50):>12.3f}{percentile(acks, 95):>12.3f}")
+        print(
+            f"{f'{kind} slippage, bps':<28}{len(slippages):>8}"
+            f"{percentile(slippages, 50):>12.2f}{percentile(slippages, 95):>12.2f}"
+        )
+
+    incomplete = len(by_execution) - len(completion_times)
+    if incomplete:
+        logger.warning(f'{incomplete} of {len(by_execution)} fork executions have unfilled legs')
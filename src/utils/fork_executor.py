@@ -0,0 +1,252 @@
+import time
+import uuid
+from asyncio import gather
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_DOWN
+from typing import Literal, Optional, Any, Callable, Awaitable
+
+from loguru import logger
+
+from src.modules.backpack.backpack_account import BackpackAccount
+
+
+@dataclass
+class ForkLeg:
+    account: BackpackAccount
+    private_key: str
+    side: Literal['Bid', 'Ask']
+    total_size: float
+    leverage: float
+    quantity: Decimal = Decimal(0)
+    filled: Decimal = Decimal(0)
+    order: Optional[dict[str, Any]] = None
+    leg_id: Optional[int] = None
+    status: str = 'pending'
+    fill_price: Optional[Decimal] = None
+
+
+class ForkExecutor:
+    """
+    Opens every leg of a fork at once: legs are sized from one shared order book snapshot,
+    submitted concurrently, and the aggregate fill is topped up or unwound until the net delta
+    is within tolerance. Every submitted order is recorded in `executions` with its timings and
+    slippage against the snapshot price.
+
+    Leg state is handed to `on_legs_update` before and after every order, so an interrupted fork
+    is resumed with its stored sizes and only the legs that are not filled yet are submitted.
+    """
+
+    def __init__(
+            self,
+            symbol: str,
+            legs: list[ForkLeg],
+            delta_tolerance: float,
+            rebalance_attempts: int,
+            on_legs_update: Optional[Callable[[list[ForkLeg]], Awaitable[None]]] = None
+    ) -> None:
+        self.symbol = symbol
+        self.legs = legs
+        self.delta_tolerance = delta_tolerance
+        self.rebalance_attempts = rebalance_attempts
+        self.on_legs_update = on_legs_update
+        self.step = Decimal(1)
+        self.execution_id = uuid.uuid4().hex
+        self.reference_prices: dict[str, Decimal] = {}
+        self.executions: list[dict[str, Any]] = []
+
+    @property
+    def long_legs(self) -> list[ForkLeg]:
+        return [leg for leg in self.legs if leg.side == 'Bid']
+
+    @property
+    def short_legs(self) -> list[ForkLeg]:
+        return [leg for leg in self.legs if leg.side == 'Ask']
+
+    @property
+    def net_delta(self) -> Decimal:
+        return sum(leg.filled for leg in self.long_legs) - sum(leg.filled for leg in self.short_legs)
+
+    @property
+    def target_quantity(self) -> Decimal:
+        return sum(leg.quantity for leg in self.long_legs)
+
+    @staticmethod
+    def leg_status(leg: ForkLeg) -> str:
+        if leg.quantity and leg.filled >= leg.quantity:
+            return 'filled'
+        return 'partial' if leg.filled else 'failed'
+
+    async def save(self, *legs: ForkLeg) -> None:
+        if self.on_legs_update and legs:
+            await self.on_legs_update(list(legs))
+
+    async def reconcile(self) -> None:
+        """Legs that were submitted when the previous run stopped take their fill from the open position."""
+        for leg in self.legs:
+            if leg.status != 'submitted':
+                continue
+
+            positions = await leg.account.get_open_positions()
+            if isinstance(positions, dict):
+                positions = positions.get('positions', [])
+            net_quantity = Decimal(0)
+            for position in positions:
+                if position.get('symbol') != self.symbol:
+                    continue
+                try:
+                    net_quantity += Decimal(str(position.get('netQuantity')))
+                except ArithmeticError:
+                    leg.account.logger.warning(f'Skipping malformed {self.symbol} position: {position}')
+            leg.filled = max(net_quantity if leg.side == 'Bid' else -net_quantity, Decimal(0))
+            leg.status = self.leg_status(leg)
+            leg.account.logger.info(f'Reconciled {leg.side} leg from open position: {leg.filled} filled')
+            await self.save(leg)
+
+    async def prepare(self) -> None:
+        depth = await self.legs[0].account.get_order_book_depth(self.symbol)
+        self.step = Decimal(1).scaleb(-BackpackAccount.decimals_from_order_book(depth))
+        best_ask, best_bid = Decimal(depth['asks'][0][0]), Decimal(depth['bids'][-1][0])
+        mid_price = (best_ask + best_bid) / 2
+        # A market buy crosses to the best ask, a market sell to the best bid
+        self.reference_prices = {'Bid': best_ask, 'Ask': best_bid}
+
+        # Once any leg was submitted the stored sizes are kept, otherwise the sides would no longer match
+        if all(leg.status == 'pending' for leg in self.legs):
+            for leg in self.legs:
+                leg.quantity = (Decimal(str(leg.total_size)) / mid_price).quantize(self.step, rounding=ROUND_DOWN)
+
+            # Both sides must open exactly the same quantity, the rounding residual goes to the largest short leg
+            residual = self.target_quantity - sum(leg.quantity for leg in self.short_legs)
+            if self.short_legs:
+                max(self.short_legs, key=lambda leg: leg.quantity).quantity += residual
+
+            await self.save(*self.legs)
+        else:
+            await self.reconcile()
+
+        logger.info(
+            f'Fork {self.symbol}: {len(self.long_legs)} long / {len(self.short_legs)} short legs, '
+            f'{self.target_quantity} per side at mid {mid_price}'
+        )
+
+    def record(self, leg: ForkLeg, side: Literal['Bid', 'Ask'], kind: str, quantity: Decimal,
+               submit_at: float, ack_at: Optional[float], order: Optional[dict[str, Any]]) -> None:
+        order = order or {}
+        executed = Decimal(str(order.get('executedQuantity') or 0))
+        expected_price = self.reference_prices.get(side)
+        fill_price = slippage_bps = None
+        if executed:
+            fill_price = Decimal(str(order.get('executedQuoteQuantity') or 0)) / executed
+            if expected_price:
+                slippage_bps = (fill_price - expected_price) / expected_price * 10_000
+                # Positive slippage is always the worse price for us
+                if side == 'Ask':
+                    slippage_bps = -slippage_bps
+
+        self.executions.append({
+            'execution_id': self.execution_id,
+            'private_key': leg.private_key,
+            'symbol': self.symbol,
+            'side': side,
+            'kind': kind,
+            'submit_at': submit_at,
+            'ack_at': ack_at,
+            'fill_at': ack_at if order.get('status') == 'Filled' else None,
+            'requested_quantity': float(quantity),
+            'filled_quantity': float(executed),
+            'expected_price': float(expected_price) if expected_price else None,
+            'fill_price': float(fill_price) if fill_price else None,
+            'slippage_bps': float(slippage_bps) if slippage_bps is not None else None
+        })
+
+    async def submit(self, leg: ForkLeg, side: Literal['Bid', 'Ask'], quantity: Decimal,
+                     reduce_only: bool = False, kind: str = 'open', persisted: bool = False) -> Decimal:
+        # `persisted` means the caller already stored the leg as submitted
+        if not persisted:
+            leg.status = 'submitted'
+            await self.save(leg)
+
+        submit_at = time.time()
+        try:
+            order = await leg.account.post_market_order(
+                symbol=self.symbol,
+                side=side,
+                quantity=str(quantity),
+                reduce_only=reduce_only
+            )
+            self.record(leg, side, kind, quantity, submit_at, time.time(), order)
+        except Exception as ex:
+            self.record(leg, side, kind, quantity, submit_at, None, None)
+            # The order may still have reached the exchange, the leg stays submitted until it is reconciled
+            leg.account.logger.error(f'Failed to submit {side} {quantity} {self.symbol}: {ex}')
+            await self.save(leg)
+            return Decimal(0)
+
+        leg.order = order
+        executed = Decimal(str(order.get('executedQuantity') or 0))
+        if executed and side == leg.side:
+            leg.fill_price = Decimal(str(order.get('executedQuoteQuantity') or 0)) / executed
+        leg.filled += executed if side == leg.side else -executed
+        leg.status = self.leg_status(leg)
+        await self.save(leg)
+
+        if order.get('status') != 'Filled':
+            leg.account.logger.warning(f'Order was not fully filled: {order}')
+        return executed
+
+    async def open_legs(self) -> None:
+        pending_legs = [leg for leg in self.legs if leg.status != 'filled' and leg.quantity > leg.filled]
+        if len(pending_legs) < len(self.legs):
+            logger.info(f'Fork {self.symbol}: resuming {len(pending_legs)} of {len(self.legs)} legs')
+
+        # All legs are stored as submitted in one write, so the orders leave together
+        for leg in pending_legs:
+            leg.status = 'submitted'
+        await self.save(*pending_legs)
+        await gather(*[
+            self.submit(leg, leg.side, leg.quantity - leg.filled, persisted=True) for leg in pending_legs
+        ])
+
+    def within_tolerance(self) -> bool:
+        return abs(self.net_delta) <= self.target_quantity * Decimal(str(self.delta_tolerance))
+
+    async def rebalance(self) -> bool:
+        for _ in range(self.rebalance_attempts):
+            if self.within_tolerance():
+                return True
+
+            net_delta = self.net_delta
+            # Top up the side that is behind, on its least filled leg
+            behind_legs = self.short_legs if net_delta > 0 else self.long_legs
+            leg = max(behind_legs, key=lambda leg: leg.quantity - leg.filled)
+            logger.warning(f'Fork {self.symbol}: net delta {net_delta}, topping up {leg.side} leg')
+            await self.submit(leg, leg.side, abs(net_delta), kind='top_up')
+
+        if self.within_tolerance():
+            return True
+
+        # Top-ups did not help, unwind the excess on the side that is ahead
+        net_delta = self.net_delta
+        ahead_legs = self.long_legs if net_delta > 0 else self.short_legs
+        for leg in sorted(ahead_legs, key=lambda leg: leg.filled, reverse=True):
+            if not net_delta:
+                break
+            quantity = min(abs(net_delta), leg.filled)
+            if not quantity:
+                continue
+            logger.warning(f'Fork {self.symbol}: unwinding {quantity} on {leg.side} leg')
+            await self.submit(leg, 'Ask' if leg.side == 'Bid' else 'Bid', quantity, reduce_only=True, kind='unwind')
+            net_delta = self.net_delta
+
+        return self.within_tolerance()
+
+    async def execute(self) -> bool:
+        await self.prepare()
+        await self.open_legs()
+        hedged = await self.rebalance()
+
+        if hedged:
+            logger.success(f'Fork {self.symbol} opened, net delta {self.net_delta}')
+        else:
+            logger.error(f'Fork {self.symbol} is out of tolerance, net delta {self.net_delta}')
+        return hedged
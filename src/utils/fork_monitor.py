@@ -0,0 +1,181 @@
+import time
+from asyncio import Semaphore, gather, sleep
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from config import TG_BOT_TOKEN, TG_USER_ID
+from src.database.models import Forks, ForkLegs
+from src.modules.backpack.account_pool import AccountPool
+from src.utils.data.wallet_registry import WalletRegistry
+from src.utils.rate_limiter import RateLimiter
+from src.utils.tg_app.telegram_notifications import send_alert
+
+
+@dataclass
+class ForkExposure:
+    fork_id: int
+    symbol: str
+    net_quantity: float = 0.0
+    net_notional: float = 0.0
+    gross_notional: float = 0.0
+    maintenance_margin: float = 0.0
+    allocated_margin: float = 0.0
+    min_liquidation_distance: float | None = None
+    missing_accounts: list[str] = field(default_factory=list)
+
+    @property
+    def margin_usage(self) -> float:
+        return self.maintenance_margin / self.allocated_margin if self.allocated_margin else 0.0
+
+
+class ForkMonitor:
+    """
+    Polls the positions of every account that takes part in a fork (one request per account per interval)
+    and aggregates net delta, margin usage and liquidation distance per fork and per symbol.
+    """
+
+    def __init__(
+            self,
+            forks: list[Forks],
+            legs: list[ForkLegs],
+            wallet_registry: WalletRegistry,
+            interval: int,
+            max_delta_usd: float,
+            max_margin_usage: float,
+            min_liquidation_distance: float,
+            concurrency: int = 20,
+            rate: float = 10
+    ) -> None:
+        self.forks = forks
+        self.legs_by_fork: dict[int, list[ForkLegs]] = {}
+        for leg in legs:
+            self.legs_by_fork.setdefault(leg.fork_id, []).append(leg)
+        self.wallet_registry = wallet_registry
+        self.interval = interval
+        self.max_delta_usd = max_delta_usd
+        self.max_margin_usage = max_margin_usage
+        self.min_liquidation_distance = min_liquidation_distance
+        self.semaphore = Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.accounts = AccountPool()
+        self.positions: dict[str, list[dict[str, Any]] | None] = {}
+        self.alerted: set[tuple[int, str]] = set()
+
+    @property
+    def account_keys(self) -> set[str]:
+        return {leg.private_key for legs in self.legs_by_fork.values() for leg in legs}
+
+    async def poll_account(self, private_key: str) -> None:
+        async with self.semaphore:
+            try:
+                account = self.accounts.get(private_key=private_key, proxy=self.wallet_registry.proxy_of(private_key))
+                async with self.limiter:
+                    positions = await account.get_open_positions()
+                self.positions[private_key] = positions.get('positions', []) if isinstance(positions, dict) \
+                    else positions
+            except Exception as ex:
+                logger.error(f'Failed to get positions for {private_key[:4]}...{private_key[-4:]}: {ex}')
+                self.positions[private_key] = None
+
+    def fork_exposure(self, fork: Forks) -> ForkExposure:
+        exposure = ForkExposure(fork_id=fork.id, symbol=fork.symbol)
+        legs = self.legs_by_fork.get(fork.id, [])
+        for leg in legs:
+            exposure.allocated_margin += leg.base_size
+
+        for private_key in dict.fromkeys(leg.private_key for leg in legs):
+            positions = self.positions.get(private_key)
+            if positions is None:
+                exposure.missing_accounts.append(private_key)
+                continue
+
+            for position in positions:
+                if position.get('symbol') != fork.symbol:
+                    continue
+
+                # One malformed entry must not stop the poll loop
+                try:
+                    quantity = float(position.get('netQuantity'))
+                    mark_price = float(position.get('markPrice'))
+                    mmf = float(position.get('mmf') or 0)
+                    liquidation_price = float(position.get('estLiquidationPrice') or 0)
+                except (TypeError, ValueError):
+                    logger.warning(f'Skipping malformed {fork.symbol} position of '
+                                   f'{private_key[:4]}...{private_key[-4:]}: {position}')
+                    continue
+                notional = quantity * mark_price
+
+                exposure.net_quantity += quantity
+                exposure.net_notional += notional
+                exposure.gross_notional += abs(notional)
+                exposure.maintenance_margin += abs(notional) * mmf
+
+                if liquidation_price and mark_price:
+                    distance = abs(mark_price - liquidation_price) / mark_price
+                    if exposure.min_liquidation_distance is None or distance < exposure.min_liquidation_distance:
+                        exposure.min_liquidation_distance = distance
+
+        return exposure
+
+    def breaches(self, exposure: ForkExposure) -> dict[str, str]:
+        breaches = {}
+        if abs(exposure.net_notional) > self.max_delta_usd:
+            breaches['delta'] = f'net delta ${exposure.net_notional:.2f}'
+        if exposure.margin_usage > self.max_margin_usage:
+            breaches['margin'] = f'margin usage {exposure.margin_usage * 100:.1f}%'
+        if exposure.min_liquidation_distance is not None \
+                and exposure.min_liquidation_distance < self.min_liquidation_distance:
+            breaches['liquidation'] = f'liquidation distance {exposure.min_liquidation_distance * 100:.1f}%'
+        if exposure.missing_accounts:
+            breaches['polling'] = f'{len(exposure.missing_accounts)} accounts not polled'
+        return breaches
+
+    async def alert(self, exposure: ForkExposure, breaches: dict[str, str]) -> None:
+        text = f'Fork {exposure.fork_id} {exposure.symbol}: ' + ', '.join(breaches.values())
+        logger.warning(text)
+
+        # Notify once per breach kind until it clears
+        kinds = {(exposure.fork_id, kind) for kind in breaches}
+        if TG_BOT_TOKEN and TG_USER_ID and kinds - self.alerted:
+            await send_alert(TG_BOT_TOKEN, TG_USER_ID, text)
+        self.alerted = {kind for kind in self.alerted if kind[0] != exposure.fork_id} | kinds
+
+    async def check(self) -> list[ForkExposure]:
+        started = time.monotonic()
+        await gather(*[self.poll_account(private_key) for private_key in self.account_keys])
+
+        exposures = [self.fork_exposure(fork) for fork in self.forks]
+        by_symbol: dict[str, float] = {}
+        for exposure in exposures:
+            by_symbol[exposure.symbol] = by_symbol.get(exposure.symbol, 0.0) + exposure.net_notional
+
+            logger.info(
+                f'[Fork {exposure.fork_id} {exposure.symbol}] net {exposure.net_quantity:.4f} '
+                f'(${exposure.net_notional:.2f}) | gross ${exposure.gross_notional:.2f} | '
+                f'margin usage {exposure.margin_usage * 100:.1f}% | liq. distance '
+                f'{"-" if exposure.min_liquidation_distance is None else f"{exposure.min_liquidation_distance * 100:.1f}%"}'
+            )
+
+            breaches = self.breaches(exposure)
+            if breaches:
+                await self.alert(exposure, breaches)
+            else:
+                self.alerted = {kind for kind in self.alerted if kind[0] != exposure.fork_id}
+
+        for symbol, net_notional in by_symbol.items():
+            logger.info(f'[{symbol}] net delta across forks: ${net_notional:.2f}')
+        logger.debug(f'Polled {len(self.account_keys)} accounts in {time.monotonic() - started:.1f}s')
+
+        return exposures
+
+    async def run(self) -> None:
+        logger.info(f'Monitoring {len(self.forks)} forks on {len(self.account_keys)} accounts '
+                    f'every {self.interval} seconds')
+        try:
+            while True:
+                await self.check()
+                await sleep(self.interval)
+        finally:
+            await self.accounts.close()
@@ -1,25 +1,32 @@
 from src.database.base_models.pydantic_manager import DataBaseManagerConfig
 from src.database.utils.db_manager import DataBaseUtils
+from src.utils.pipeline import TaskRun
+from src.utils.balance_snapshots import invalidate_balance
+from src.utils.status_writer import status_writer
 
 
 async def manage_tasks(private_key: str, task: str) -> None:
+    status_writer.put_task_status(private_key, task)
+    # Balance snapshot is dropped right away, the next module must not read the old balance
+    await invalidate_balance(private_key)
+
+
+async def manage_task_duration(private_key: str, task: str, task_run: TaskRun) -> None:
     db_utils = DataBaseUtils(
         manager_config=DataBaseManagerConfig(
-            action='wallets_tasks'
+            action='task_durations'
         )
     )
 
-    await db_utils.add_to_db(
+    await db_utils.add_task_duration(
         private_key=private_key,
         task_name=task,
-        status='completed'
+        started_at=task_run.started_at,
+        finished_at=task_run.finished_at,
+        requests=task_run.requests,
+        status='completed' if task_run.result else 'failed'
     )
 
 
 async def manage_fork(fork_id: int) -> None:
-    db_utils = DataBaseUtils(
-        manager_config=DataBaseManagerConfig(
-            action='forks_mode'
-        )
-    )
-    await db_utils.update_fork_status(fork_id)
+    status_writer.put_fork_status(fork_id)
@@ -0,0 +1,136 @@
+import time
+from asyncio import Queue, Future, Task, create_task, get_running_loop, gather
+from dataclasses import dataclass
+from typing import Callable, Awaitable, Optional, Any
+
+from loguru import logger
+
+from src.models.route import Route
+from src.utils.request_client.client import request_counter
+
+
+@dataclass
+class TaskRun:
+    result: Optional[bool]
+    started_at: float
+    finished_at: float
+    requests: int
+    # Raised by the handler, the run is still returned so its duration is recorded as failed
+    error: Optional[Exception] = None
+
+
+class Stage:
+    def __init__(self, name: str, concurrency: int) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue: Queue = Queue()
+        self.workers: list[Task] = []
+
+        self.max_queue_depth = 0
+        self.processed = 0
+        self.failed = 0
+        self.wait_time = 0.0
+        self.busy_time = 0.0
+        self.started_at: float | None = None
+
+    def start(self) -> None:
+        if self.workers:
+            return
+        self.started_at = time.monotonic()
+        self.workers = [create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, handler: Callable[[Route], Awaitable[Optional[bool]]], route: Route) -> Future:
+        self.start()
+        future = get_running_loop().create_future()
+        self.queue.put_nowait((handler, route, future, time.monotonic()))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+
+    async def _worker(self) -> None:
+        while True:
+            handler, route, future, enqueued_at = await self.queue.get()
+            started = time.monotonic()
+            started_at = time.time()
+            self.wait_time += started - enqueued_at
+
+            counter = [0]
+            token = request_counter.set(counter)
+            try:
+                result = await handler(route)
+                if not future.done():
+                    future.set_result(TaskRun(result, started_at, time.time(), counter[0]))
+            except Exception as ex:
+                self.failed += 1
+                if not future.done():
+                    future.set_result(TaskRun(None, started_at, time.time(), counter[0], ex))
+            finally:
+                request_counter.reset(token)
+                self.busy_time += time.monotonic() - started
+                self.processed += 1
+                self.queue.task_done()
+
+    def metrics(self) -> dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            'stage': self.name,
+            'concurrency': self.concurrency,
+            'processed': self.processed,
+            'failed': self.failed,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'avg_wait': self.wait_time / self.processed if self.processed else 0.0,
+            'avg_busy': self.busy_time / self.processed if self.processed else 0.0,
+            'utilization': self.busy_time / (elapsed * self.concurrency) if elapsed else 0.0,
+        }
+
+
+class StagePipeline:
+    """
+    Routes every module call through a per-stage queue, so slow stages (OKX withdrawals,
+    deposits waiting for confirmation) do not block wallets that are already trading.
+    """
+
+    def __init__(
+            self,
+            handlers: dict[str, Callable[[Route], Awaitable[Optional[bool]]]],
+            task_stages: dict[str, str],
+            concurrency: dict[str, int],
+            default_stage: str = 'trading'
+    ) -> None:
+        self.handlers = handlers
+        self.task_stages = task_stages
+        self.default_stage = default_stage
+        self.stages = {
+            name: Stage(name, concurrency.get(name, 1))
+            for name in {*task_stages.values(), default_stage, *concurrency.keys()}
+        }
+
+    async def run(self, task: str, route: Route) -> TaskRun:
+        stage = self.stages[self.task_stages.get(task, self.default_stage)]
+        return await stage.submit(self.handlers[task], route)
+
+    async def stop(self) -> None:
+        for stage in self.stages.values():
+            await stage.stop()
+
+    def log_metrics(self) -> None:
+        metrics = [stage.metrics() for stage in self.stages.values() if stage.processed]
+        if not metrics:
+            return
+
+        for stage in metrics:
+            logger.info(
+                f'[Stage {stage["stage"]}] processed: {stage["processed"]} (failed: {stage["failed"]}) | '
+                f'workers: {stage["concurrency"]} | max queue: {stage["max_queue_depth"]} | '
+                f'avg wait: {stage["avg_wait"]:.1f}s | avg run: {stage["avg_busy"]:.1f}s | '
+                f'utilization: {stage["utilization"] * 100:.0f}%'
+            )
+
+        bottleneck = max(metrics, key=lambda stage: (stage['avg_wait'], stage['utilization']))
+        logger.info(f'Bottleneck stage: {bottleneck["stage"]} (avg wait {bottleneck["avg_wait"]:.1f}s)')
@@ -0,0 +1,97 @@
+import time
+from asyncio import Semaphore, gather
+from typing import AsyncIterator
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.models.route import RouteRecord
+from src.modules.backpack.account_pool import AccountPool
+from src.utils.data.wallet_registry import WalletRegistry
+from src.utils.rate_limiter import RateLimiter
+
+
+async def check_wallet(
+        private_key: str,
+        wallet_registry: WalletRegistry,
+        accounts: AccountPool,
+        semaphore: Semaphore,
+        limiter: RateLimiter
+) -> dict:
+    check = {
+        'private_key': private_key,
+        'proxy': wallet_registry.raw_proxy_of(private_key),
+        'api_ok': False,
+        'proxy_ok': False,
+        'error': None,
+    }
+
+    async with semaphore:
+        try:
+            account = accounts.get(private_key=private_key, proxy=wallet_registry.proxy_of(private_key))
+
+            async with limiter:
+                _, status = await account.make_request(method='GET', url=f'{account.backpack_api_url}api/v1/status')
+            check['proxy_ok'] = status == 200
+            if not check['proxy_ok']:
+                raise ValueError(f'Proxy check failed with status {status}')
+
+            async with limiter:
+                await account._query('balanceQuery', 'get', 'api/v1/capital')
+            check['api_ok'] = True
+        except Exception as ex:
+            check['error'] = str(ex)[:255]
+        finally:
+            await accounts.release(private_key)
+
+    check['checked_at'] = time.time()
+    return check
+
+
+async def run_preflight(wallet_registry: WalletRegistry, concurrency: int, rate: float) -> dict[str, str]:
+    logger.info(f'Preflight: checking {len(wallet_registry)} wallets and their proxies')
+
+    semaphore = Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    accounts = AccountPool()
+    checks = await gather(*[
+        check_wallet(private_key, wallet_registry, accounts, semaphore, limiter)
+        for private_key in wallet_registry.private_keys
+    ])
+
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='wallet_checks'
+        )
+    )
+    await db_utils.save_wallet_checks(checks)
+
+    failed = {check['private_key']: check['error'] for check in checks if check['error']}
+    for private_key, error in failed.items():
+        logger.warning(f'Preflight failed for wallet {private_key[:4]}...{private_key[-4:]}: {error}')
+    logger.info(f'Preflight: {len(checks) - len(failed)} wallets OK, {len(failed)} failed')
+
+    return failed
+
+
+async def get_failed_wallets(max_age: int) -> dict[str, str]:
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='wallet_checks'
+        )
+    )
+    return await db_utils.get_failed_wallets(max_age)
+
+
+async def exclude_failed_routes(routes: AsyncIterator[RouteRecord], max_age: int) -> AsyncIterator[RouteRecord]:
+    failed = await get_failed_wallets(max_age)
+
+    async for route in routes:
+        if route.private_key in failed:
+            logger.warning(
+                f'Skipping wallet {route.private_key[:4]}...{route.private_key[-4:]} '
+                f'that failed preflight: {failed[route.private_key]}'
+            )
+            continue
+        yield route
@@ -0,0 +1,57 @@
+import time
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.utils.proxy_pool import ProxyPool, BAN_STATUSES
+
+
+async def validate_proxies(
+        pool: ProxyPool,
+        ttl: int,
+        timeout: float,
+        concurrency: int
+) -> dict[str, bool]:
+    """
+    Probes every proxy of the pool that has no fresh result in the DB and marks the failed ones in the pool.
+    proxies.txt is left untouched so proxies stay paired with wallets by line.
+    """
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='proxy_checks'
+        )
+    )
+    results = await db_utils.get_proxy_checks(ttl)
+    results = {proxy_url: ok for proxy_url, ok in results.items() if proxy_url in pool.stats}
+
+    to_check = [proxy_url for proxy_url in pool.stats if proxy_url not in results]
+    if to_check:
+        started = time.monotonic()
+        probes = await pool.probe_all(to_check, timeout=timeout, concurrency=concurrency)
+        checked_at = time.time()
+
+        checks = [
+            {
+                'proxy': proxy_url,
+                'ok': status is not None and status not in BAN_STATUSES,
+                'status': status,
+                'latency': latency,
+                'checked_at': checked_at,
+            }
+            for proxy_url, (status, latency) in probes.items()
+        ]
+        await db_utils.save_proxy_checks(checks)
+        results.update({check['proxy']: check['ok'] for check in checks})
+        logger.debug(f'Probed {len(to_check)} proxies in {time.monotonic() - started:.2f}s')
+
+    failed = [proxy_url for proxy_url, ok in results.items() if not ok]
+    for proxy_url in failed:
+        pool.mark_failed(proxy_url)
+        logger.warning(f'Proxy {proxy_url.split("@")[-1]} failed the check')
+
+    logger.info(
+        f'Proxy check: {len(results) - len(failed)} OK, {len(failed)} failed '
+        f'({len(results) - len(to_check)} from cache)'
+    )
+    return results
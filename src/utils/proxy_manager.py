@@ -1,8 +1,13 @@
-from aiohttp import ClientSession
-from asyncio import sleep
+import time
+from asyncio import Task, create_task, shield, sleep
 
+from aiohttp import ClientSession, ClientTimeout
 from loguru import logger
 
+from config import ROTATE_IP_MAX_ATTEMPTS, ROTATE_IP_BACKOFF, ROTATE_IP_CONFIRM_TIMEOUT
+
+PROBE_URL = 'https://api.backpack.exchange/api/v1/status'
+
 
 class Proxy:
     def __init__(
@@ -14,17 +19,111 @@ class Proxy:
         self.change_link = change_link
 
     async def change_ip(self) -> None:
-        while True:
+        await ip_rotator.rotate(self)
+
+
+class IPRotator:
+    """
+    Rotates mobile proxy IPs. Concurrent rotations of the same modem share one attempt, failed
+    attempts back off exponentially up to a cap, and waiters are released only once the new egress
+    IP answers through the proxy. Rotation latency is tracked per modem for scheduling.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 5,
+            backoff: float = 4,
+            confirm_timeout: float = 30,
+            alpha: float = 0.3
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.confirm_timeout = confirm_timeout
+        self.alpha = alpha
+        self.rotations: dict[str, Task] = {}
+        self.latencies: dict[str, float] = {}
+        self.rotated = 0
+        self.shared = 0
+        self.failed = 0
+        self.session: ClientSession | None = None
+
+    def _session(self) -> ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = ClientSession(timeout=ClientTimeout(total=15))
+        return self.session
+
+    def expected_latency(self, change_link: str | None) -> float:
+        return self.latencies.get(change_link, 0.0)
+
+    async def rotate(self, proxy: Proxy) -> None:
+        task = self.rotations.get(proxy.change_link)
+        if task is None:
+            task = create_task(self._rotate(proxy))
+            self.rotations[proxy.change_link] = task
+            task.add_done_callback(lambda done: self._finished(proxy.change_link, done))
+        else:
+            self.shared += 1
+        # A cancelled waiter (e.g. a warm-up task) must not cancel the rotation for the other wallets
+        await shield(task)
+
+    def _finished(self, change_link: str, task: Task) -> None:
+        self.rotations.pop(change_link, None)
+        # Retrieved here, so a rotation whose waiters were all cancelled does not log an unhandled error
+        if not task.cancelled():
+            task.exception()
+
+    async def _rotate(self, proxy: Proxy) -> None:
+        started = time.monotonic()
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await sleep(self.backoff * 2 ** (attempt - 1))
             try:
-                async with ClientSession() as session:
-                    response = await session.get(self.change_link)
+                async with self._session().get(proxy.change_link) as response:
                     if response.status != 200:
-                        logger.error(f'Failed to change ip')
+                        logger.error(f'Failed to change ip, status {response.status}')
                         continue
-                    # logger.success('Successfully changed ip')
-                    break
 
+                if await self._confirm(proxy):
+                    break
+                logger.error(f'New ip is not reachable after {self.confirm_timeout}s')
             except Exception as ex:
-                logger.error(ex)
-                await sleep(4)
-                continue
+                logger.error(f'Failed to change ip: {ex}')
+        else:
+            self.failed += 1
+            raise RuntimeError(f'Failed to change ip after {self.max_attempts} attempts')
+
+        latency = time.monotonic() - started
+        previous = self.latencies.get(proxy.change_link)
+        self.latencies[proxy.change_link] = latency if previous is None else previous + self.alpha * (latency - previous)
+        self.rotated += 1
+
+    async def _confirm(self, proxy: Proxy) -> bool:
+        deadline = time.monotonic() + self.confirm_timeout
+        while time.monotonic() < deadline:
+            try:
+                async with self._session().get(
+                        PROBE_URL, proxy=proxy.proxy_url, timeout=ClientTimeout(total=5)
+                ) as response:
+                    if response.status == 200:
+                        return True
+            except Exception:
+                pass
+            await sleep(1)
+        return False
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def log_metrics(self) -> None:
+        if not self.rotated and not self.failed:
+            return
+        average = sum(self.latencies.values()) / len(self.latencies) if self.latencies else 0
+        logger.info(
+            f'IP rotator: {self.rotated} rotations ({self.shared} shared by concurrent wallets), '
+            f'{self.failed} failed, avg latency {average:.1f}s'
+        )
+
+
+ip_rotator = IPRotator(ROTATE_IP_MAX_ATTEMPTS, ROTATE_IP_BACKOFF, ROTATE_IP_CONFIRM_TIMEOUT)
@@ -0,0 +1,181 @@
+import time
+from asyncio import Task, Semaphore, create_task, gather, sleep
+from dataclasses import dataclass
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from loguru import logger
+
+from config import PROXY_BAN_COOLDOWN, PROXY_MIN_SUCCESS_RATE, PROXY_HEALTH_CHECK_INTERVAL
+from src.utils.data.helper import proxies
+from src.utils.proxy_manager import Proxy, PROBE_URL
+
+BAN_STATUSES = (403, 429)
+
+
+@dataclass
+class ProxyStats:
+    requests: int = 0
+    failures: int = 0
+    bans: int = 0
+    success_rate: float = 1.0
+    latency: float | None = None
+    banned_at: float = 0.0
+
+
+class ProxyPool:
+    """
+    Health of every proxy, scored from real traffic: success rate and latency EWMA, 403/429 answers
+    put the proxy on a cooldown. Wallets stick to their own proxy and move to the best healthy spare
+    while it is degraded; a background loop probes degraded proxies so they can recover.
+    Mobile proxies are scored but never swapped, their modems are rotated instead.
+    """
+
+    def __init__(
+            self,
+            proxy_urls: list[str],
+            ban_cooldown: float = 300,
+            min_success_rate: float = 0.5,
+            check_interval: float = 60,
+            alpha: float = 0.2
+    ) -> None:
+        self.stats: dict[str, ProxyStats] = {proxy_url: ProxyStats() for proxy_url in dict.fromkeys(proxy_urls)}
+        self.ban_cooldown = ban_cooldown
+        self.min_success_rate = min_success_rate
+        self.check_interval = check_interval
+        self.alpha = alpha
+        self.affinity: dict[str, str] = {}
+        self.checker: Task | None = None
+
+    def _stats(self, proxy_url: str) -> ProxyStats:
+        return self.stats.setdefault(proxy_url, ProxyStats())
+
+    def record(self, proxy_url: str, latency: float, status: int | None) -> None:
+        stats = self._stats(proxy_url)
+        stats.requests += 1
+
+        # Any HTTP answer except a ban means the proxy itself works
+        ok = status is not None and status not in BAN_STATUSES
+        if status in BAN_STATUSES:
+            stats.bans += 1
+            stats.banned_at = time.monotonic()
+        elif status is None:
+            stats.failures += 1
+
+        stats.success_rate += self.alpha * (float(ok) - stats.success_rate)
+        if ok:
+            stats.latency = latency if stats.latency is None else stats.latency + self.alpha * (latency - stats.latency)
+
+        if not self.is_healthy(proxy_url):
+            self.start()
+
+    def is_healthy(self, proxy_url: str) -> bool:
+        stats = self._stats(proxy_url)
+        if stats.banned_at and time.monotonic() - stats.banned_at < self.ban_cooldown:
+            return False
+        return stats.success_rate >= self.min_success_rate
+
+    def score(self, proxy_url: str) -> float:
+        stats = self._stats(proxy_url)
+        return stats.success_rate / (1 + (stats.latency or 0))
+
+    def best_spare(self, exclude: set[str] = frozenset()) -> str | None:
+        candidates = [
+            proxy_url for proxy_url in self.stats
+            if proxy_url not in exclude and self.is_healthy(proxy_url)
+        ]
+        return max(candidates, key=self.score, default=None)
+
+    def proxy_for(self, affinity_key: str | None, proxy: Proxy | None) -> Proxy | None:
+        """The wallet's own proxy while it is healthy, otherwise the spare the wallet sticks to."""
+        if not proxy or proxy.change_link or not affinity_key:
+            return proxy
+
+        if self.is_healthy(proxy.proxy_url):
+            self.affinity.pop(affinity_key, None)
+            return proxy
+
+        spare = self.affinity.get(affinity_key)
+        if not spare or not self.is_healthy(spare):
+            spare = self.best_spare(exclude={proxy.proxy_url})
+            if not spare:
+                return proxy
+            self.affinity[affinity_key] = spare
+            logger.warning(f'Proxy {proxy.proxy_url.split("@")[-1]} is degraded, '
+                           f'switching to {spare.split("@")[-1]}')
+
+        return Proxy(proxy_url=spare)
+
+    async def probe(self, session: ClientSession, proxy_url: str, timeout: float) -> tuple[int | None, float]:
+        started = time.monotonic()
+        try:
+            async with session.get(PROBE_URL, proxy=proxy_url, timeout=ClientTimeout(total=timeout)) as response:
+                status = response.status
+        except Exception:
+            status = None
+        latency = time.monotonic() - started
+        self.record(proxy_url, latency, status)
+        return status, latency
+
+    async def probe_all(
+            self,
+            proxy_urls: list[str],
+            timeout: float = 5,
+            concurrency: int = 50
+    ) -> dict[str, tuple[int | None, float]]:
+        """Probes proxies concurrently through one pooled session, the proxy is picked per request."""
+        semaphore = Semaphore(concurrency)
+
+        async def check(proxy_url: str) -> tuple[int | None, float]:
+            async with semaphore:
+                return await self.probe(session, proxy_url, timeout)
+
+        async with ClientSession(connector=TCPConnector(limit=concurrency, ssl=False)) as session:
+            results = await gather(*[check(proxy_url) for proxy_url in proxy_urls])
+
+        return dict(zip(proxy_urls, results))
+
+    def mark_failed(self, proxy_url: str) -> None:
+        """Takes a proxy out of rotation until a health check sees it working again."""
+        self._stats(proxy_url).success_rate = 0.0
+        self.start()
+
+    async def _check_degraded(self) -> None:
+        degraded = [proxy_url for proxy_url in self.stats if not self.is_healthy(proxy_url)]
+        if not degraded:
+            return
+
+        results = await self.probe_all(degraded)
+        for proxy_url, (status, _) in results.items():
+            # A working probe lifts the proxy back to the threshold, real traffic decides the rest
+            if status is not None and status not in BAN_STATUSES:
+                stats = self._stats(proxy_url)
+                stats.success_rate = max(stats.success_rate, self.min_success_rate)
+
+        recovered = sum(self.is_healthy(proxy_url) for proxy_url in degraded)
+        logger.debug(f'Proxy health check: {recovered}/{len(degraded)} degraded proxies recovered')
+
+    async def _run(self) -> None:
+        while any(not self.is_healthy(proxy_url) for proxy_url in self.stats):
+            await sleep(self.check_interval)
+            try:
+                await self._check_degraded()
+            except Exception as ex:
+                logger.error(f'Proxy health check failed: {ex}')
+
+    def start(self) -> None:
+        if self.checker is None or self.checker.done():
+            self.checker = create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.checker is not None:
+            self.checker.cancel()
+            await gather(self.checker, return_exceptions=True)
+            self.checker = None
+
+
+proxy_pool = ProxyPool(
+    proxy_urls=[f'http://{proxy.split("|")[0]}' for proxy in proxies if proxy],
+    ban_cooldown=PROXY_BAN_COOLDOWN,
+    min_success_rate=PROXY_MIN_SUCCESS_RATE,
+    check_interval=PROXY_HEALTH_CHECK_INTERVAL
+)
@@ -0,0 +1,36 @@
+import time
+from asyncio import Lock, sleep
+from typing import Optional, Type
+import types
+
+
+class RateLimiter:
+    """Token bucket: allows `rate` acquisitions per `per` seconds, bursting up to `rate`"""
+
+    def __init__(self, rate: float, per: float = 1.0) -> None:
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate / self.per)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await sleep((1 - self.tokens) * self.per / self.rate)
+
+    async def __aenter__(self) -> 'RateLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self,
+                        exc_type: Optional[Type[BaseException]],
+                        exc_value: Optional[BaseException],
+                        traceback: Optional[types.TracebackType]) -> None:
+        pass
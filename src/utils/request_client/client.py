@@ -1,30 +1,45 @@
+from contextvars import ContextVar
 from typing import Dict, Any
 from loguru import logger
-import random
+import time
 
 from aiohttp import ClientSession, TCPConnector
 from aiohttp_socks import ProxyConnector
 
-from src.utils.data.helper import proxies
 from src.utils.proxy_manager import Proxy
+from src.utils.proxy_pool import proxy_pool
+
+# Set by the task runner to count HTTP requests made while a single module is running
+request_counter: ContextVar[list[int] | None] = ContextVar('request_counter', default=None)
 
 
 class RequestClient:
-    def __init__(self, proxy: Proxy | None):
+    def __init__(self, proxy: Proxy | str | None):
+        # CEX settings give the proxy as a plain 'http://login:pass@ip:port' string
+        if isinstance(proxy, str):
+            proxy = Proxy(proxy_url=proxy) if proxy else None
         self.session = None
+        self.home_proxy = proxy
+        # Set by the account pool, lets the proxy pool keep a wallet on the same spare proxy
+        self.affinity_key: str | None = None
+        self.active_proxy_url: str | None = None
+        # Requests running per session, a replaced session is closed once its last request finishes
+        self.in_flight: dict[ClientSession, int] = {}
         self.create_session(proxy)
 
     def create_session(self, proxy: Proxy | None):
         try:
             connector = ProxyConnector.from_url(proxy.proxy_url) if proxy else TCPConnector(verify_ssl=False)
             self.session = ClientSession(connector=connector)
+            self.active_proxy_url = proxy.proxy_url if proxy else None
         except Exception as ex:
             logger.error(f"Failed to create session with proxy. | Error: {ex}")
-            random_proxy = f"http://{random.choice(proxies)}" if proxies else None
+            failed_url = proxy.proxy_url if isinstance(proxy, Proxy) else proxy
+            spare = proxy_pool.best_spare(exclude={failed_url} if failed_url else set())
 
-            if random_proxy:
-                logger.info(f"Retrying with a random proxy...")
-                self.create_session(Proxy(proxy_url=random_proxy, change_link=None))
+            if spare:
+                logger.info(f"Retrying with the best spare proxy...")
+                self.create_session(Proxy(proxy_url=spare, change_link=None))
             else:
                 logger.error("No proxies available for retry.")
                 raise RuntimeError("Failed to create a session and no proxies are available.")
@@ -38,10 +53,30 @@ class RequestClient:
             json: Dict[str, Any] = None,
             params: Dict[str, Any] = None
     ):
+        counter = request_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+        proxy = proxy_pool.proxy_for(self.affinity_key, self.home_proxy)
+        if proxy and proxy.proxy_url != self.active_proxy_url:
+            # The account is shared between tasks, so the old session may still serve their requests
+            previous = self.session
+            self.create_session(proxy)
+            if not self.in_flight.get(previous):
+                await previous.close()
+
+        session = self.session
+        self.in_flight[session] = self.in_flight.get(session, 0) + 1
+        proxy_url = self.active_proxy_url
+        started = time.monotonic()
+        recorded = False
         try:
-            async with self.session.request(
+            async with session.request(
                     method=method, url=url, headers=headers, data=data, params=params, json=json
             ) as response:
+                if proxy_url:
+                    proxy_pool.record(proxy_url, time.monotonic() - started, response.status)
+                    recorded = True
                 if response.status in [200, 201, 202]:
                     response_json = await response.json()
                     return response_json, response.status
@@ -53,4 +88,12 @@ class RequestClient:
                     return None, response.status
         except Exception as ex:
             logger.error(f"Something went wrong during request: {ex}")
+            if proxy_url and not recorded:
+                proxy_pool.record(proxy_url, time.monotonic() - started, None)
             return None, None
+        finally:
+            self.in_flight[session] -= 1
+            if not self.in_flight[session]:
+                del self.in_flight[session]
+                if session is not self.session:
+                    await session.close()
@@ -1,42 +1,51 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from loguru import logger
 
 from src.database.base_models.pydantic_manager import DataBaseManagerConfig
 from src.database.utils.db_manager import DataBaseUtils
-from src.models.route import Route, Wallet
+from src.models.route import Route, RouteRecord
+from src.utils.data.wallet_registry import WalletRegistry
 
 
-async def get_routes(private_keys: str) -> Optional[List[Route]]:
+async def iter_routes(wallet_registry: WalletRegistry, page_size: int = 500) -> AsyncIterator[RouteRecord]:
+    """Pages pending routes out of the database as the scheduler asks for them."""
     db_utils = DataBaseUtils(
         manager_config=DataBaseManagerConfig(
             action='working_wallets'
         )
     )
-    result = await db_utils.get_uncompleted_wallets()
-    if not result:
+
+    after_id = 0
+    found = False
+    while True:
+        page = await db_utils.get_pending_wallets_with_tasks(after_id=after_id, limit=page_size)
+        if not page:
+            break
+
+        found = True
+        after_id = page[-1][0].id
+        for wallet, tasks in page:
+            if wallet.private_key not in wallet_registry:
+                continue
+
+            yield RouteRecord(
+                private_key=wallet.private_key,
+                recipient=wallet.recipient,
+                proxy=wallet.proxy,
+                tasks=tuple(tasks)
+            )
+
+        if len(page) < page_size:
+            break
+
+    if not found:
         logger.success(f'Все кошельки с данной базы данных уже отработали')
-        return None
-
-    routes = []
-    for wallet in result:
-        for private_key in private_keys:
-            if wallet.private_key.lower() == private_key.lower():
-                private_key_tasks = await db_utils.get_wallet_pending_tasks(private_key)
-                tasks = []
-                for task in private_key_tasks:
-                    tasks.append(task.task_name)
-                routes.append(
-                    Route(
-                        tasks=tasks,
-                        wallet=Wallet(
-                            private_key=private_key,
-                            recipient=wallet.recipient,
-                            proxy=wallet.proxy,
-                        )
-                    )
-                )
-    return routes
+
+
+async def get_routes(wallet_registry: WalletRegistry) -> Optional[List[Route]]:
+    routes = [record.to_route() async for record in iter_routes(wallet_registry)]
+    return routes or None
 
 
 async def get_forks_tasks():
@@ -45,4 +54,17 @@ async def get_forks_tasks():
             action='forks_mode'
         )
     )
+    await db_utils.backfill_fork_legs()
     return await db_utils.get_uncompleted_forks()
+
+
+async def get_monitored_forks():
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='forks_mode'
+        )
+    )
+    await db_utils.backfill_fork_legs()
+    forks = await db_utils.get_forks(['pending', 'completed'])
+    legs = await db_utils.get_fork_legs([fork.id for fork in forks])
+    return forks, legs
@@ -7,13 +7,18 @@ from loguru import logger
 
 from config import *
 from src.database.base_models.pydantic_manager import DataBaseManagerConfig
-from src.database.models import Forks
+from src.database.archive import archive_run
+from src.database.models import Forks, engine
 from src.database.utils.db_manager import DataBaseUtils
 from src.models.cex import OKXConfig, WithdrawSettings, CEXConfig, DepositSettings
 from src.models.route import Route
-from src.modules.backpack.backpack_account import BackpackAccount
+from src.modules.backpack.account_pool import account_pool
 from src.modules.cex.okx.okx import OKX
-from src.utils.proxy_manager import Proxy
+from src.utils.data.helper import wallet_registry
+from src.utils.deposit_addresses import fetch_deposit_addresses, get_deposit_address
+from src.utils.balance_snapshots import get_balances
+from src.utils.fork_executor import ForkExecutor, ForkLeg
+from src.utils.delta_neutral import create_delta_neutral_strategy
 
 
 async def process_backpack_spot(route: Route) -> Optional[bool]:
@@ -23,9 +28,9 @@ async def process_backpack_spot(route: Route) -> Optional[bool]:
 
     token = symbol.split('_')[0]
 
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
     try:
@@ -128,9 +133,9 @@ async def process_backpack_futures(route: Route) -> Optional[bool]:
     leverage = BackpackFuturesSettings.leverage
     symbol = random.choice(BackpackFuturesSettings.symbol) + '_USDC_PERP'
 
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
     usdc_balance = await backpack.get_balances("USDC")
@@ -161,9 +166,9 @@ async def process_backpack_futures(route: Route) -> Optional[bool]:
 
 
 async def process_random_swaps(route: Route) -> Optional[bool]:
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
     logger.info("Starting random token swaps until USDC is depleted")
@@ -285,9 +290,9 @@ async def process_random_swaps(route: Route) -> Optional[bool]:
 
 
 async def process_swap_all_to_usdc(route: Route) -> Optional[bool]:
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
     logger.info("Starting conversion of all tokens to USDC")
@@ -365,9 +370,9 @@ async def process_swap_all_to_usdc(route: Route) -> Optional[bool]:
 
 
 async def process_close_all_positions(route: Route) -> Optional[bool]:
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
     logger.info(f"Closing all positions for account")
@@ -385,9 +390,9 @@ async def process_close_all_positions(route: Route) -> Optional[bool]:
 
 
 async def process_get_usdc_symbols(route: Route) -> Optional[bool]:
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
     spot, futures = await backpack.get_usdc_symbols()
     print(spot)
@@ -396,69 +401,32 @@ async def process_get_usdc_symbols(route: Route) -> Optional[bool]:
         return True
 
 
-async def process_multiple_deposit_addresses(api_keys: List[str], proxies: Optional[List[str]] = None) -> Dict[
-    str, str]:
-    with open('deposit_addresses.txt', 'w') as file:
-        file.write("# API Key : Deposit Address\n")
-
+async def process_multiple_deposit_addresses(api_keys: List[str]) -> Dict[str, str]:
     logger.info(f"Processing {len(api_keys)} API keys to get deposit addresses")
 
-    results = {}
-
-    proxy_index = 0
-    for i, api_key in enumerate(api_keys):
-        try:
-            with open('wallets.txt', 'r') as file:
-                file_private_keys = [line.strip() for line in file]
-
-            key_index = file_private_keys.index(api_key)
-
-            proxy = proxies[key_index]
-            proxy_index = (proxy_index + 1) % len(proxies)
-
-            change_link = ''
-
-            if proxy:
-                if MOBILE_PROXY:
-                    proxy_url, change_link = proxy.split('|')
-                else:
-                    proxy_url = proxy
-
-                proxy = Proxy(proxy_url=proxy_url, change_link=change_link)
-
-            backpack = BackpackAccount(
-                proxy=proxy,
-                api_key=api_key
-            )
-
-            address = await backpack.get_deposit_address(chain='Solana')
-            shortened_key = api_key[:6] + '...' + api_key[-4:]
-            logger.success(f"[{i + 1}/{len(api_keys)}] Retrieved Solana deposit address for {shortened_key}: {address}")
-
-            results[api_key] = address
-
-            with open('deposit_addresses.txt', 'a') as file:
-                file.write(f"{api_key}:{address}\n")
-
-            if i < len(api_keys) - 1:
-                time_to_pause = random.randint(PAUSE_BETWEEN_MODULES[0], PAUSE_BETWEEN_MODULES[1])
-                logger.info(f'Sleeping {time_to_pause} seconds before next wallet...')
-                await sleep(time_to_pause)
+    results = await fetch_deposit_addresses(
+        api_keys,
+        wallet_registry,
+        concurrency=DEPOSIT_ADDRESS_CONCURRENCY,
+        rate=DEPOSIT_ADDRESS_RATE,
+        chain='Solana'
+    )
 
-        except Exception as ex:
-            logger.error(f"[{i + 1}/{len(api_keys)}] Failed to get deposit address for key {api_key[:6]}...: {ex}")
+    with open('deposit_addresses.txt', 'w') as file:
+        file.write("# API Key : Deposit Address\n")
+        file.writelines(f"{api_key}:{address}\n" for api_key, address in results.items())
 
     logger.info(f"Successfully retrieved {len(results)} deposit addresses out of {len(api_keys)}")
     return results
 
 
 async def process_cex_withdraw(route: Route) -> Optional[bool]:
-    backpack = BackpackAccount(
-        proxy=route.wallet.proxy,
-        api_key=route.wallet.private_key
+    backpack = account_pool.get(
+        private_key=route.wallet.private_key,
+        proxy=route.wallet.proxy
     )
 
-    address = await backpack.get_deposit_address(chain='Solana')
+    address = await get_deposit_address(backpack, route.wallet.private_key, chain='Solana')
 
     chain = OKXWithdrawSettings.chain
     token = OKXWithdrawSettings.token
@@ -528,152 +496,36 @@ async def process_cex_deposit(route: Route) -> Optional[bool]:
         return True
 
 
-def create_delta_neutral_strategy(balances):
-    accounts = list(balances.keys())
-    all_positions = []
-    used_accounts = set()
-    MAX_LEVERAGE = 5.0
-
-    total_accounts = len(accounts)
-    min_accounts_per_pair = 3
-    max_accounts_per_pair = 6
-    avg_accounts_per_pair = 5
-    num_pairs = total_accounts // avg_accounts_per_pair
-    if total_accounts >= min_accounts_per_pair and num_pairs == 0:
-        num_pairs = 1
-
-    for _ in range(num_pairs):
-        symbol = f"{random.choice(BackpackFuturesSettings.symbol)}_USDC_PERP"
-        remaining_accounts = [acc for acc in accounts if acc not in used_accounts]
-        if len(remaining_accounts) < min_accounts_per_pair:
-            break
-
-        long_account = random.choice(remaining_accounts)
-        used_accounts.add(long_account)
-
-        long_base_size = round(balances[long_account] * random.uniform(0.65, 0.75))
-        if long_base_size > balances[long_account] * 0.75:
-            long_base_size = round(balances[long_account] * 0.75)
-        long_leverage = random.randint(2, 5)
-        long_position_size = round(long_base_size * long_leverage, 2)
-
-        remaining_after_long = [acc for acc in remaining_accounts if acc != long_account]
-        max_short_accounts = min(5, len(remaining_after_long))
-        min_short_accounts = 2
-        num_short_accounts = random.randint(min_short_accounts, min(max_short_accounts, max_accounts_per_pair - 1))
-
-        short_accounts = random.sample(remaining_after_long, num_short_accounts)
-        used_accounts.update(short_accounts)
-
-        total_available_short = sum(balances[acc] for acc in short_accounts)
-        short_positions = []
-
-        for acc in short_accounts:
-            proportion = balances[acc] / total_available_short
-            target_total_size = round(long_position_size * proportion, 2)
-
-            leverage = min(MAX_LEVERAGE, max(2, random.uniform(2, 3)))
-            base_size = round(target_total_size / leverage, 2)
-
-            if base_size > balances[acc]:
-                base_size = round(balances[acc], 2)
-                target_total_size = round(base_size * leverage, 2)
-
-            short_positions.append({
-                "symbol": symbol,
-                "account": acc,
-                "direction": "short",
-                "base_size": base_size,
-                "leverage": round(leverage, 2),
-                "total_size": target_total_size
-            })
-
-        total_short_size = sum(pos["total_size"] for pos in short_positions)
-        correction_factor = long_position_size / total_short_size if total_short_size > 0 else 1
-
-        used_total_sizes = set()
-        for pos in short_positions:
-            pos["total_size"] = round(pos["total_size"] * correction_factor, 2)
-            pos["base_size"] = round(pos["total_size"] / pos["leverage"], 2)
-
-            if pos["base_size"] > balances[pos["account"]]:
-                pos["base_size"] = round(balances[pos["account"]], 2)
-                pos["leverage"] = round(pos["total_size"] / pos["base_size"], 2)
-                if pos["leverage"] > MAX_LEVERAGE:
-                    pos["leverage"] = MAX_LEVERAGE
-                pos["total_size"] = round(pos["base_size"] * pos["leverage"], 2)
-
-            while pos["total_size"] in used_total_sizes:
-                deviation = random.uniform(-0.5, 0.5)
-                pos["total_size"] = round(pos["total_size"] + deviation, 2)
-                pos["base_size"] = round(pos["total_size"] / pos["leverage"], 2)
-                if pos["base_size"] > balances[pos["account"]]:
-                    pos["base_size"] = round(balances[pos["account"]], 2)
-                    pos["total_size"] = round(pos["base_size"] * pos["leverage"], 2)
-            used_total_sizes.add(pos["total_size"])
-
-        all_positions.append({
-            "symbol": symbol,
-            "account": long_account,
-            "direction": "long",
-            "base_size": long_base_size,
-            "leverage": long_leverage,
-            "total_size": long_position_size
-        })
-        all_positions.extend(short_positions)
-
-    return all_positions
-
-
-async def process_forks_database_creation(keys: list[str], proxies: list[str]):
-    balance_mapping = {}
-
+async def process_forks_database_creation(keys: list[str]):
     db_utils = DataBaseUtils(
         manager_config=DataBaseManagerConfig(
             action='forks_mode'
         )
     )
 
-    proxy_index = 0
-    for api_key in keys:
-        with open('wallets.txt', 'r') as file:
-            file_private_keys = [line.strip() for line in file]
-
-        key_index = file_private_keys.index(api_key)
-
-        proxy = proxies[key_index]
-        proxy_index = (proxy_index + 1) % len(proxies)
-
-        change_link = ''
-
-        if proxy:
-            if MOBILE_PROXY:
-                proxy_url, change_link = proxy.split('|')
-            else:
-                proxy_url = proxy
-
-            proxy = Proxy(proxy_url=f'http://{proxy_url}', change_link=change_link)
-
-        backpack = BackpackAccount(
-            proxy=proxy,
-            api_key=api_key
-        )
-
-        balance = await backpack.get_balances("USDC")
-        balance_mapping.update({api_key: balance})
+    balance_mapping = await get_balances(
+        keys,
+        wallet_registry,
+        symbol='USDC',
+        max_age=BALANCE_SNAPSHOT_TTL,
+        concurrency=BALANCE_SNAPSHOT_CONCURRENCY,
+        rate=BALANCE_SNAPSHOT_RATE
+    )
 
-    result = create_delta_neutral_strategy(balance_mapping)
+    result = create_delta_neutral_strategy(balance_mapping, BackpackFuturesSettings.symbol, seed=FORKS_SEED)
 
     symbol_totals = {}
 
-    forks_by_symbol = {}
+    # Positions come as a long followed by the shorts of its group, every group becomes its own fork
+    # so groups are opened, hedged and rebalanced independently
+    fork_groups = []
     for position in result:
-        symbol = position['symbol']
-        if symbol not in forks_by_symbol:
-            forks_by_symbol[symbol] = {'accounts': [], 'long': [], 'short': []}
+        if position['direction'] == 'long':
+            fork_groups.append({'symbol': position['symbol'], 'accounts': [], 'long': [], 'short': []})
+        group = fork_groups[-1]
 
-        if position['account'] not in forks_by_symbol[symbol]['accounts']:
-            forks_by_symbol[symbol]['accounts'].append(position['account'])
+        if position['account'] not in group['accounts']:
+            group['accounts'].append(position['account'])
 
         pos_data = {
             'account': position['account'],
@@ -682,11 +534,13 @@ async def process_forks_database_creation(keys: list[str], proxies: list[str]):
             'total_size': position['total_size']
         }
         if position['direction'] == 'long':
-            forks_by_symbol[symbol]['long'].append(pos_data)
+            group['long'].append(pos_data)
         else:
-            forks_by_symbol[symbol]['short'].append(pos_data)
+            group['short'].append(pos_data)
 
-    await db_utils.fill_forks_table(forks_by_symbol)
+    await archive_run(engine, 'forks', ARCHIVE_DB_PATH)
+    run_id = await db_utils.start_run('forks')
+    await db_utils.fill_forks_table(fork_groups, run_id)
 
     for pos in result:
         if pos['symbol'] not in symbol_totals:
@@ -703,64 +557,70 @@ async def process_forks_database_creation(keys: list[str], proxies: list[str]):
         print(f"Дельта: ${round(totals['long'] - totals['short'], 2)}")
 
 
-async def process_fork(task: Forks, proxies: list[str]) -> bool:
+async def process_fork(task: Forks) -> bool:
     symbol = task.symbol
-    forks = task.forks
-
-    all_positions = []
-
-    for pos in forks['long']:
-        pos_with_type = pos.copy()
-        pos_with_type['type'] = 'Bid'
-        all_positions.append(pos_with_type)
-
-    for pos in forks['short']:
-        pos_with_type = pos.copy()
-        pos_with_type['type'] = 'Ask'
-        all_positions.append(pos_with_type)
-
-    random.shuffle(all_positions)
-
-    proxy_index = 0
-    for position in all_positions:
-        with open('wallets.txt', 'r') as file:
-            file_private_keys = [line.strip() for line in file]
-
-        key_index = file_private_keys.index(position['account'])
-
-        proxy = proxies[key_index]
-        proxy_index = (proxy_index + 1) % len(proxies)
-
-        change_link = ''
-
-        if proxy:
-            if MOBILE_PROXY:
-                proxy_url, change_link = proxy.split('|')
-            else:
-                proxy_url = proxy
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='fork_legs'
+        )
+    )
 
-            proxy = Proxy(proxy_url=f'http://{proxy_url}', change_link=change_link)
+    legs = [
+        ForkLeg(
+            account=account_pool.get(
+                private_key=fork_leg.private_key,
+                proxy=wallet_registry.proxy_of(fork_leg.private_key)
+            ),
+            private_key=fork_leg.private_key,
+            side=fork_leg.side,
+            total_size=fork_leg.total_size,
+            leverage=fork_leg.leverage,
+            quantity=Decimal(str(fork_leg.quantity or 0)),
+            filled=Decimal(str(fork_leg.filled_quantity or 0)),
+            leg_id=fork_leg.id,
+            status=fork_leg.status
+        )
+        for fork_leg in await db_utils.get_fork_legs([task.id])
+    ]
+    if not legs:
+        logger.warning(f'Fork {task.id} {symbol} has no legs')
+        return False
 
-        try:
-            backpack = BackpackAccount(
-                proxy=proxy,
-                api_key=position['account']
-            )
+    async def save_legs(fork_legs: list[ForkLeg]) -> None:
+        await db_utils.update_fork_legs([
+            {
+                'leg_id': leg.leg_id,
+                'new_quantity': float(leg.quantity),
+                'new_filled_quantity': float(leg.filled),
+                'new_status': leg.status,
+                'new_fill_price': float(leg.fill_price) if leg.fill_price else None,
+                'new_order_id': leg.order.get('id') if leg.order else None
+            }
+            for leg in fork_legs
+        ])
+
+    executor = ForkExecutor(
+        symbol=symbol,
+        legs=legs,
+        delta_tolerance=FORK_DELTA_TOLERANCE,
+        rebalance_attempts=FORK_REBALANCE_ATTEMPTS,
+        on_legs_update=save_legs
+    )
 
-            await backpack.open_futures_pos(
-                symbol=symbol,
-                side=position['type'],
-                amount_usd=position['total_size']
+    try:
+        return await executor.execute()
+    except Exception as ex:
+        logger.error(f"Failed to open fork {symbol}: {ex}")
+        return False
+    finally:
+        for leg in legs:
+            await account_pool.release(leg.private_key)
+        if executor.executions:
+            executions_db_utils = DataBaseUtils(
+                manager_config=DataBaseManagerConfig(
+                    action='fork_executions'
+                )
             )
-            logger.info(
-                f"Opened {position['type']} position on {BackpackFuturesSettings.symbol} "
-                f"with {position['total_size']} USDC (leverage: {position['leverage']}x)"
+            await executions_db_utils.add_fork_executions(
+                [{'fork_id': task.id, **execution} for execution in executor.executions]
             )
-        except Exception as ex:
-            logger.error(f"Failed to open position: {ex}")
-
-        time_to_sleep = random.randint(PAUSE_BETWEEN_MODULES[0], PAUSE_BETWEEN_MODULES[1])
-        logger.info(f'Sleeping {time_to_sleep} seconds...')
-        await sleep(time_to_sleep)
-
-    return True
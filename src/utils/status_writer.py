@@ -0,0 +1,146 @@
+import time
+from asyncio import Queue, Task, Event, create_task, wait_for, sleep, TimeoutError
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+
+from config import STATUS_WRITER_BATCH_SIZE, STATUS_WRITER_FLUSH_INTERVAL
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+
+
+@dataclass
+class StatusEvent:
+    private_key: Optional[str] = None
+    task_name: Optional[str] = None
+    fork_id: Optional[int] = None
+    status: str = 'completed'
+
+
+class StatusWriter:
+    """
+    Write-behind queue for task and fork statuses: modules only enqueue a status change,
+    one background task commits the changes in batches once `batch_size` events are queued
+    or `flush_interval` seconds have passed since the first one.
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 1, retries: int = 5) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retries = max(1, retries)
+        self.queue: Queue[StatusEvent] = Queue()
+        self.writer: Task | None = None
+        self.stopping = Event()
+
+        self.max_queue_depth = 0
+        self.written = 0
+        self.batches = 0
+        self.write_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def start(self) -> None:
+        if self.writer is None or self.writer.done():
+            self.stopping.clear()
+            self.writer = create_task(self._run())
+
+    def put(self, event: StatusEvent) -> None:
+        self.start()
+        self.queue.put_nowait(event)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def put_task_status(self, private_key: str, task_name: str, status: str = 'completed') -> None:
+        self.put(StatusEvent(private_key=private_key, task_name=task_name, status=status))
+
+    def put_fork_status(self, fork_id: int) -> None:
+        self.put(StatusEvent(fork_id=fork_id))
+
+    async def _collect(self) -> list[StatusEvent]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self.stopping.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: list[StatusEvent]) -> None:
+        db_utils = DataBaseUtils(
+            manager_config=DataBaseManagerConfig(
+                action='wallets_tasks'
+            )
+        )
+        started = time.monotonic()
+        await db_utils.write_status_batch(
+            task_statuses=[
+                {'private_key': event.private_key, 'task_name': event.task_name, 'status': event.status}
+                for event in batch if event.task_name
+            ],
+            fork_ids=[event.fork_id for event in batch if event.fork_id is not None]
+        )
+        self.write_time += time.monotonic() - started
+        self.written += len(batch)
+        self.batches += 1
+
+    async def _write_with_retries(self, batch: list[StatusEvent]) -> None:
+        """
+        Never drops a batch: a completed task that stays 'pending' would run again next time,
+        which for OKX withdrawals and deposits means moving funds twice. flush() and stop()
+        wait until the batch is written.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._write(batch)
+            except Exception as ex:
+                logger.error(f'Failed to write {len(batch)} statuses to DataBase (attempt {attempt}): {ex}')
+                if attempt == self.retries:
+                    logger.critical(
+                        f'Statuses are still not saved after {attempt} attempts, retrying until the DataBase '
+                        f'is available: {batch}'
+                    )
+                await sleep(self.flush_interval * min(attempt, self.retries))
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._write_with_retries(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def flush(self) -> None:
+        if self.writer is not None and not self.writer.done():
+            await self.queue.join()
+
+    async def stop(self) -> None:
+        """Writes every queued status before the writer task is cancelled, however many retries it takes."""
+        self.stopping.set()
+        await self.flush()
+        if self.writer is not None:
+            self.writer.cancel()
+            self.writer = None
+        self.log_metrics()
+
+    def log_metrics(self) -> None:
+        if not self.batches:
+            return
+        logger.info(
+            f'Status writer: {self.written} statuses in {self.batches} batches '
+            f'(avg {self.written / self.batches:.1f}), max queue depth {self.max_queue_depth}, '
+            f'{self.write_time:.2f}s writing'
+        )
+
+
+status_writer = StatusWriter(STATUS_WRITER_BATCH_SIZE, STATUS_WRITER_FLUSH_INTERVAL)
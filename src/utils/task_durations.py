@@ -0,0 +1,57 @@
+from statistics import median
+from typing import AsyncIterator
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.models.route import RouteRecord
+from src.utils.stats import percentile
+
+
+async def get_duration_history() -> dict[str, list[tuple[float, int]]]:
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='task_durations'
+        )
+    )
+    return await db_utils.get_task_durations()
+
+
+async def order_routes_longest_first(routes: AsyncIterator[RouteRecord]) -> AsyncIterator[RouteRecord]:
+    # Ordering needs every route, only the compact records are held for it
+    records = [route async for route in routes]
+    history = await get_duration_history()
+    if not history:
+        logger.info('No task duration history yet, keeping routes in database order')
+    elif records:
+        predicted = {task: median(duration for duration, _ in runs) for task, runs in history.items()}
+        default = median(predicted.values())
+
+        def route_duration(route: RouteRecord) -> float:
+            return sum(predicted.get(task, default) for task in route.tasks)
+
+        records.sort(key=route_duration, reverse=True)
+        logger.info(
+            f'Routes ordered longest first: predicted {route_duration(records[0]):.0f}s '
+            f'... {route_duration(records[-1]):.0f}s'
+        )
+
+    for record in records:
+        yield record
+
+
+async def print_durations_report() -> None:
+    history = await get_duration_history()
+    if not history:
+        logger.info('No task duration history yet')
+        return
+
+    print(f"\n{'Module':<20}{'Runs':>8}{'p50, s':>12}{'p95, s':>12}{'Requests p50':>16}")
+    for task, runs in sorted(history.items()):
+        durations = [duration for duration, _ in runs]
+        requests = [requests for _, requests in runs]
+        print(
+            f'{task:<20}{len(runs):>8}{percentile(durations, 50):>12.1f}'
+            f'{percentile(durations, 95):>12.1f}{percentile(requests, 50):>16.0f}'
+        )
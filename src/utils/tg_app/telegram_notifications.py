@@ -64,6 +64,23 @@ class TGApp(RequestClient):
         )
 
 
+async def send_alert(token: str, tg_id: int, text: str) -> None:
+    client = RequestClient(proxy=None)
+    try:
+        await client.make_request(
+            method='GET',
+            url=f'https://api.telegram.org/bot{token}/sendMessage',
+            params={
+                "parse_mode": "MarkdownV2",
+                "disable_web_page_preview": 1,
+                "chat_id": tg_id,
+                "text": escape_markdown_v2(text),
+            }
+        )
+    finally:
+        await client.session.close()
+
+
 def escape_markdown_v2(text: str) -> str:
     specials = r"_-*[]()~`>#+=|{}.!"
     for char in specials:
@@ -0,0 +1,94 @@
+from asyncio import Lock, Task, create_task
+from collections import Counter, defaultdict
+
+from loguru import logger
+
+from config import MOBILE_PROXY, ROTATE_IP
+from src.models.route import Route
+from src.modules.backpack.account_pool import account_pool
+from src.utils.proxy_manager import ip_rotator
+
+
+class WarmUp:
+    """
+    Prepares upcoming wallets while the scheduler is pausing: rotates the mobile IP, opens the pooled
+    session, checks the balance with the API key and loads market metadata.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, Task] = {}
+        # Modem rotated by a warm-up and not used by anyone since, mapped to the wallet it was rotated for
+        self.fresh_links: dict[str, str] = {}
+        self.links_in_use: Counter = Counter()
+        # Wallets that reserved their modem in ready() and are waiting for their own warm-up
+        self.starting: set[str] = set()
+        # Starting wallets rotate one after another, a rotation shared by two of them would give both the same IP
+        self.link_locks: defaultdict[str, Lock] = defaultdict(Lock)
+
+    @staticmethod
+    def _needs_rotation(route: Route) -> bool:
+        proxy = route.wallet.proxy
+        return bool(proxy and proxy.proxy_url and proxy.change_link and MOBILE_PROXY and ROTATE_IP)
+
+    def rotation_delay(self, route: Route) -> float:
+        """Expected time ready() will spend rotating the IP for a wallet that was not warmed up."""
+        if not self._needs_rotation(route) or route.wallet.private_key in self.tasks:
+            return 0.0
+        return ip_rotator.expected_latency(route.wallet.proxy.change_link)
+
+    def prefetch(self, route: Route) -> None:
+        private_key = route.wallet.private_key
+        if private_key not in self.tasks:
+            self.tasks[private_key] = create_task(self._warm(route))
+
+    async def _warm(self, route: Route) -> None:
+        private_key = route.wallet.private_key
+        try:
+            # Rotating a modem that a running wallet still uses would break its connections
+            change_link = route.wallet.proxy.change_link if self._needs_rotation(route) else None
+            if change_link and not self.links_in_use[change_link] and change_link not in self.fresh_links:
+                await route.wallet.proxy.change_ip()
+                # A rotation shared with a wallet that started meanwhile gave that wallet the new IP
+                in_use = self.links_in_use[change_link] - (private_key in self.starting)
+                if not in_use and change_link not in self.fresh_links:
+                    self.fresh_links[change_link] = private_key
+
+            account = account_pool.get(private_key=private_key, proxy=route.wallet.proxy)
+            await account.get_balances('USDC')
+            await account.get_markets()
+            logger.debug(f'Warmed up wallet {private_key[:4]}...{private_key[-4:]}')
+        except Exception as ex:
+            logger.warning(f'Warm-up failed for wallet {private_key[:4]}...{private_key[-4:]}: {ex}')
+
+    async def ready(self, route: Route) -> None:
+        private_key = route.wallet.private_key
+        change_link = route.wallet.proxy.change_link if self._needs_rotation(route) else None
+        # Reserved before any await, so warm-ups of later wallets leave this modem alone
+        if change_link:
+            self.links_in_use[change_link] += 1
+
+        try:
+            task = self.tasks.pop(private_key, None)
+            if task:
+                self.starting.add(private_key)
+                try:
+                    await task
+                finally:
+                    self.starting.discard(private_key)
+
+            if change_link:
+                if self.fresh_links.get(change_link) == private_key:
+                    del self.fresh_links[change_link]
+                else:
+                    # The rotation below replaces an IP another wallet was warmed up on
+                    self.fresh_links.pop(change_link, None)
+                    async with self.link_locks[change_link]:
+                        await route.wallet.proxy.change_ip()
+        except BaseException:
+            # The wallet does not start, release() is not called for it
+            self.release(route)
+            raise
+
+    def release(self, route: Route) -> None:
+        if self._needs_rotation(route):
+            self.links_in_use[route.wallet.proxy.change_link] -= 1
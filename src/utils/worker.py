@@ -0,0 +1,144 @@
+import os
+import socket
+from asyncio import Task, sleep, create_task, gather
+from typing import Callable, Awaitable, AsyncIterator
+
+from loguru import logger
+
+from src.database.base_models.pydantic_manager import DataBaseManagerConfig
+from src.database.utils.db_manager import DataBaseUtils
+from src.models.route import Route, RouteRecord, Wallet
+from src.utils.data.wallet_registry import WalletRegistry
+from src.utils.status_writer import status_writer
+
+
+def get_worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+async def keep_lease_alive(db_utils: DataBaseUtils, wallet_id: int, lease_token: str, lease_seconds: int) -> None:
+    while True:
+        await sleep(lease_seconds / 3)
+        if not await db_utils.renew_lease(wallet_id, lease_token, lease_seconds):
+            logger.warning(f'Lost lease for wallet id {wallet_id}, another worker may pick it up')
+            return
+
+
+async def worker_slot(
+        worker_id: str,
+        wallet_registry: WalletRegistry,
+        process_route: Callable[[Route], Awaitable[None]],
+        lease_seconds: int
+) -> None:
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='working_wallets'
+        )
+    )
+    while True:
+        claimed = await db_utils.claim_wallet(worker_id, lease_seconds)
+        if not claimed:
+            if await db_utils.get_leased_wallets_count():
+                await sleep(lease_seconds / 3)
+                continue
+            return
+
+        wallet, lease_token = claimed
+        heartbeat = create_task(keep_lease_alive(db_utils, wallet.id, lease_token, lease_seconds))
+        try:
+            private_key = wallet.private_key
+            if private_key not in wallet_registry:
+                logger.warning(f'Wallet id {wallet.id} is not in wallets.txt, skipping')
+                continue
+
+            tasks = await db_utils.get_wallet_pending_tasks(private_key)
+            route = Route(
+                tasks=[task.task_name for task in tasks],
+                wallet=Wallet(
+                    private_key=private_key,
+                    recipient=wallet.recipient,
+                    proxy=wallet.proxy,
+                )
+            )
+            logger.info(f'[{worker_id}] Claimed wallet id {wallet.id}')
+            await process_route(route)
+        except Exception as ex:
+            logger.error(f'[{worker_id}] Failed to process wallet id {wallet.id}: {ex}')
+        finally:
+            heartbeat.cancel()
+            # Statuses of the wallet must be stored before another process may pick it up
+            await status_writer.flush()
+            await db_utils.release_lease(wallet.id, lease_token)
+
+
+async def run_worker(
+        wallet_registry: WalletRegistry,
+        process_route: Callable[[Route], Awaitable[None]],
+        concurrency: int,
+        lease_seconds: int
+) -> None:
+    worker_id = get_worker_id()
+    logger.info(f'Worker {worker_id} started with {concurrency} slots')
+    await gather(*[
+        worker_slot(worker_id, wallet_registry, process_route, lease_seconds)
+        for _ in range(concurrency)
+    ])
+    logger.success(f'Worker {worker_id} has no more wallets to claim')
+
+
+class RouteLeases:
+    """
+    Leases the wallets of the database mode the same way worker processes do, so both can run on one
+    database: a wallet leased by a worker, or already processed by one in this run, is skipped.
+    """
+
+    def __init__(self, lease_seconds: int) -> None:
+        self.worker_id = get_worker_id()
+        self.lease_seconds = lease_seconds
+        self.db_utils = DataBaseUtils(
+            manager_config=DataBaseManagerConfig(
+                action='working_wallets'
+            )
+        )
+        self.leases: dict[str, tuple[int, str, Task]] = {}
+
+    async def claim(self, routes: AsyncIterator[RouteRecord]) -> AsyncIterator[RouteRecord]:
+        async for route in routes:
+            claimed = await self.db_utils.claim_wallet_by_key(route.private_key, self.worker_id, self.lease_seconds)
+            if not claimed:
+                logger.info(f'Wallet {route.private_key[:4]}...{route.private_key[-4:]} '
+                            f'is taken by a worker, skipping')
+                continue
+
+            wallet_id, lease_token = claimed
+            heartbeat = create_task(keep_lease_alive(self.db_utils, wallet_id, lease_token, self.lease_seconds))
+            self.leases[route.private_key] = (wallet_id, lease_token, heartbeat)
+            yield route
+
+    async def release(self, private_key: str) -> None:
+        lease = self.leases.pop(private_key, None)
+        if not lease:
+            return
+
+        wallet_id, lease_token, heartbeat = lease
+        heartbeat.cancel()
+        # Statuses of the wallet must be stored before another process may pick it up
+        await status_writer.flush()
+        await self.db_utils.release_lease(wallet_id, lease_token)
+
+    async def release_all(self) -> None:
+        for private_key in list(self.leases):
+            await self.release(private_key)
+
+
+async def reset_released_leases() -> None:
+    db_utils = DataBaseUtils(
+        manager_config=DataBaseManagerConfig(
+            action='working_wallets'
+        )
+    )
+    # Wallets released by workers that are still running stay marked as done for their run
+    if leased := await db_utils.get_leased_wallets_count():
+        logger.info(f'{leased} wallets are leased by running workers, keeping processed wallets skipped')
+        return
+    await db_utils.reset_released_leases()